@@ -0,0 +1 @@
+PYTHONPATH=src python3 benchmarks/run.py "$@"
\ No newline at end of file
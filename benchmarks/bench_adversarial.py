@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from inline_markdown import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+from markdown import markdown_to_html
+from textnode import TextNode, TextType
+
+# Each case builds a single paragraph out of n repeats of a unit; several
+# are deliberately invalid so the parser has to give up on them quickly.
+CASES = {
+    "link list": lambda n: "[link](/page) " * n,
+    "image list": lambda n: "![alt](/image.png) " * n,
+    "mixed inline": lambda n: "x ![i](/i.png) [l](/u) **b** _i_ `c` " * n,
+    "open brackets": lambda n: "[" * n,
+    "unclosed links": lambda n: "[a](b " * n,
+    "bang brackets": lambda n: "![" * n,
+    "unmatched underscore": lambda n: "_" + "word " * n,
+    "star run": lambda n: "**" * n,
+    "underscores in code": lambda n: "`" + "_" * n + "`",
+    "megabyte paragraph": lambda n: "plain words in one long paragraph " * (n * 8),
+}
+
+PARSERS = {
+    "text_to_textnodes": text_to_textnodes,
+    "split_nodes_link": lambda text: split_nodes_link([TextNode(text, TextType.TEXT)]),
+    "split_nodes_image": lambda text: split_nodes_image([TextNode(text, TextType.TEXT)]),
+    "split_nodes_delimiter": lambda text: split_nodes_delimiter([TextNode(text, TextType.TEXT)], "**", TextType.BOLD),
+    "markdown_to_html": markdown_to_html,
+}
+
+
+def best_time(parse, text, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            parse(text)
+        except Exception:
+            # Invalid syntax is an expected outcome; only the time matters.
+            pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pathological inline inputs; fails if parse time grows super-linearly.")
+    parser.add_argument("--size", type=int, default=4000, help="repeats of each case's unit in the small input")
+    parser.add_argument("--scale", type=int, default=8, help="how much larger the big input is")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ratio", type=float, default=None,
+                        help="largest allowed big/small time ratio (default: 2.5 x scale)")
+    args = parser.parse_args()
+    max_ratio = args.max_ratio if args.max_ratio is not None else 2.5 * args.scale
+
+    failures = []
+    for case, make in CASES.items():
+        small = make(args.size)
+        large = make(args.size * args.scale)
+        print(f"{case} ({len(small)} -> {len(large)} chars)")
+        for name, parse in PARSERS.items():
+            small_time = best_time(parse, small, args.repeat)
+            large_time = best_time(parse, large, args.repeat)
+            # Sub-millisecond runs are mostly noise; rate those against 1ms.
+            ratio = large_time / max(small_time, 0.001)
+            flag = ""
+            if ratio > max_ratio:
+                flag = "  SUPER-LINEAR"
+                failures.append((case, name, ratio))
+            print(f"  {name:<22} {small_time * 1000:9.2f} ms {large_time * 1000:9.2f} ms  x{ratio:6.1f}{flag}")
+
+    if failures:
+        print(f"{len(failures)} case(s) grew more than x{max_ratio:g} for a x{args.scale} larger input:")
+        for case, name, ratio in failures:
+            print(f"  {case}: {name} x{ratio:.1f}")
+        sys.exit(1)
+    print(f"All cases within x{max_ratio:g} for a x{args.scale} larger input")
+
+
+if __name__ == "__main__":
+    main()
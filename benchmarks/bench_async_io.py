@@ -0,0 +1,73 @@
+import argparse
+import builtins
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pipeline
+import utils
+from corpus import CorpusSpec, generate_corpus
+from pipeline import generate_pages_async
+from utils import generate_pages_recursive
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "..", "template.html")
+
+
+@contextlib.contextmanager
+def slow_filesystem(latency):
+    # Simulates a network filesystem: every open of a page source or output
+    # costs one round trip, and so does closing (flushing) it.
+    def slow_open(*args, **kwargs):
+        time.sleep(latency)
+        f = builtins.open(*args, **kwargs)
+        close = f.close
+
+        def slow_close():
+            time.sleep(latency)
+            close()
+
+        f.close = slow_close
+        return f
+
+    modules = (utils, pipeline)
+    for module in modules:
+        module.open = slow_open
+    try:
+        yield
+    finally:
+        for module in modules:
+            del module.open
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial vs --async-io page builds on a simulated slow filesystem.")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated cost of each open and close")
+    parser.add_argument("--depth", type=int, nargs="+", default=[4, 16, 64])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        content = os.path.join(tmp, "content")
+        generate_corpus(content, CorpusSpec(pages=args.pages))
+
+        def run(label, build):
+            dest = os.path.join(tmp, f"out-{label}")
+            start = time.perf_counter()
+            with slow_filesystem(args.latency_ms / 1000), contextlib.redirect_stdout(io.StringIO()):
+                build(dest)
+            return time.perf_counter() - start
+
+        baseline = run("serial", lambda dest: generate_pages_recursive(content, TEMPLATE, dest, "/", force=True))
+        print(f"serial       {baseline:7.3f}s  {args.pages / baseline:9.1f} pages/s")
+        for depth in args.depth:
+            elapsed = run(f"async-{depth}", lambda dest: generate_pages_async(content, TEMPLATE, dest, "/", force=True, depth=depth))
+            print(f"async d={depth:<4} {elapsed:7.3f}s  {args.pages / elapsed:9.1f} pages/s  speedup {baseline / elapsed:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from block_markdown import block_to_block_type, scan_blocks
+from corpus import CorpusSpec, page
+
+
+def split_and_classify(markdown):
+    # The split-then-classify pair scan_blocks replaced.
+    blocks = [block for block in (block.strip() for block in markdown.split("\n\n")) if block]
+    return [(block_to_block_type(block), block) for block in blocks]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="scan_blocks vs markdown_to_blocks + block_to_block_type on large documents.")
+    parser.add_argument("--blocks", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    markdown = page(random.Random(0), "Large", CorpusSpec(blocks=args.blocks))
+    print(f"document: {len(markdown) / 1e6:.2f} MB, {args.blocks} blocks")
+    results = {}
+    for name, scan in (("split+classify", split_and_classify), ("scan_blocks", lambda md: list(scan_blocks(md)))):
+        results[name] = min(timeit.repeat(lambda: scan(markdown), number=1, repeat=args.repeat))
+        print(f"{name:<15} {results[name] * 1000:8.2f} ms")
+    print(f"speedup         {results['split+classify'] / results['scan_blocks']:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import inline_text
+from inline_markdown import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+from textnode import TextNode, TextType
+
+
+def multipass_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    return nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-pass vs five-pass inline parsing on inline-heavy paragraphs.")
+    parser.add_argument("--paragraphs", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    paragraphs = [inline_text(rng, 12, density=0.8) for _ in range(args.paragraphs)]
+    for paragraph in paragraphs:
+        assert text_to_textnodes(paragraph) == multipass_text_to_textnodes(paragraph)
+
+    results = {}
+    for name, parse in (("five-pass", multipass_text_to_textnodes), ("single-pass", text_to_textnodes)):
+        results[name] = min(timeit.repeat(lambda: [parse(p) for p in paragraphs], number=1, repeat=args.repeat))
+        print(f"{name:<12} {results[name] * 1000:8.2f} ms for {args.paragraphs} paragraphs")
+    print(f"speedup      {results['five-pass'] / results['single-pass']:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import CorpusSpec, page
+from htmlnode import LeafNode, ParentNode
+from markdown import markdown_to_html_node
+from textnode import TextNode, TextType
+
+
+def traced_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory held by node objects, measured with tracemalloc.")
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--blocks", type=int, default=2000)
+    args = parser.parse_args()
+
+    n = args.nodes
+    scenarios = {
+        "TextNode": lambda: [TextNode("x", TextType.TEXT) for _ in range(n)],
+        "LeafNode": lambda: [LeafNode("b", "x") for _ in range(n)],
+        "ParentNode": lambda: [ParentNode("p", None) for _ in range(n)],
+    }
+    for name, build in scenarios.items():
+        # The list itself costs 8 bytes per slot; report only the nodes.
+        per_node = (traced_bytes(build) - traced_bytes(lambda: [None] * n)) / n
+        print(f"{name:<12} {per_node:7.1f} bytes/node")
+
+    markdown = page(random.Random(0), "Memory", CorpusSpec(blocks=args.blocks))
+    size = traced_bytes(lambda: markdown_to_html_node(markdown))
+    print(f"{'page tree':<12} {size / 1e6:7.2f} MB for {args.blocks} blocks ({len(markdown) / 1e6:.2f} MB of markdown)")
+
+
+if __name__ == "__main__":
+    main()
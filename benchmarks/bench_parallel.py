@@ -0,0 +1,40 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import CorpusSpec, generate_corpus
+from utils import generate_pages_recursive
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "..", "template.html")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Page throughput for 1..N worker processes.")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        content = os.path.join(tmp, "content")
+        generate_corpus(content, CorpusSpec(pages=args.pages))
+        jobs = 1
+        baseline = None
+        while jobs <= args.max_jobs:
+            dest = os.path.join(tmp, f"out-{jobs}")
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_recursive(content, TEMPLATE, dest, "/", force=True, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"jobs={jobs:<3} {elapsed:7.3f}s  {args.pages / elapsed:9.1f} pages/s  speedup {baseline / elapsed:4.2f}x")
+            jobs *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import os
+import random
+
+WORDS = (
+    "ring hobbit elf wizard shire mordor gondor rohan river mountain forest "
+    "road song tale king steward sword bow horse tower gate shadow light"
+).split()
+
+DEFAULT_BLOCK_MIX = {
+    "paragraph": 55,
+    "heading": 10,
+    "unordered_list": 10,
+    "ordered_list": 10,
+    "quote": 10,
+    "code": 5,
+}
+
+
+class CorpusSpec:
+    def __init__(self, pages=100, blocks=30, block_mix=None, inline_density=0.4, links=5, images=1, seed=0):
+        self.pages = pages
+        self.blocks = blocks
+        self.block_mix = block_mix or DEFAULT_BLOCK_MIX
+        # Probability that a sentence carries a bold, italic or code span.
+        self.inline_density = inline_density
+        # Links and images per page, placed in randomly chosen inline blocks.
+        self.links = links
+        self.images = images
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def inline_text(rng, sentences=4, density=0.4):
+    parts = []
+    for _ in range(sentences):
+        text = sentence(rng)
+        if rng.random() < density:
+            word = rng.choice(WORDS)
+            text += rng.choice((f" **{word}**", f" _{word}_", f" `{word}`"))
+        parts.append(text + ".")
+    return " ".join(parts)
+
+
+def block(rng, kind, density):
+    if kind == "heading":
+        return f"{'#' * rng.randint(2, 4)} {sentence(rng, 4)}"
+    if kind == "unordered_list":
+        return "\n".join(f"- {inline_text(rng, 1, density)}" for _ in range(4))
+    if kind == "ordered_list":
+        return "\n".join(f"{i + 1}. {inline_text(rng, 1, density)}" for i in range(4))
+    if kind == "quote":
+        return f"> {inline_text(rng, 2, density)}"
+    if kind == "code":
+        return f"```\n{sentence(rng)}\n{sentence(rng)}\n```"
+    return inline_text(rng, 4, density)
+
+
+def page(rng, title, spec):
+    kinds = list(spec.block_mix)
+    weights = [spec.block_mix[kind] for kind in kinds]
+    blocks = [block(rng, kind, spec.inline_density) for kind in rng.choices(kinds, weights, k=spec.blocks)]
+
+    inline_blocks = [i for i, text in enumerate(blocks) if not text.startswith(("#", "```"))]
+    if inline_blocks:
+        for _ in range(spec.links):
+            i = rng.choice(inline_blocks)
+            blocks[i] += f" See [{rng.choice(WORDS)}](/{rng.choice(WORDS)}/{rng.choice(WORDS)})."
+        for _ in range(spec.images):
+            i = rng.choice(inline_blocks)
+            blocks[i] += f" ![{rng.choice(WORDS)}](/images/{rng.choice(WORDS)}.png)"
+
+    return "\n\n".join([f"# {title}"] + blocks) + "\n"
+
+
+def iter_corpus(spec):
+    rng = random.Random(spec.seed)
+    for i in range(spec.pages):
+        yield os.path.join(f"section{i % 10}", f"page{i}", "index.md"), page(rng, f"Page {i}", spec)
+
+
+def generate_corpus(root, spec):
+    for rel_path, markdown in iter_corpus(spec):
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(markdown)
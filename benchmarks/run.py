@@ -0,0 +1,121 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from block_markdown import BlockType, block_to_block_type, markdown_to_blocks, scan_blocks
+from corpus import CorpusSpec, generate_corpus, iter_corpus
+from inline_markdown import text_to_textnodes
+from main import main as build_main
+from markdown import markdown_to_html, markdown_to_html_node, parse_document
+
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def scenarios(spec, tmp):
+    pages = [markdown for _, markdown in iter_corpus(spec)]
+    blocks = [block for markdown in pages for block in markdown_to_blocks(markdown)]
+    inline = [block for block in blocks if block_to_block_type(block) is BlockType.PARAGRAPH]
+    trees = [markdown_to_html_node(markdown) for markdown in pages]
+
+    root = os.path.join(tmp, "site")
+    generate_corpus(os.path.join(root, "content"), spec)
+    shutil.copytree(os.path.join(PROJECT_ROOT, "static"), os.path.join(root, "static"))
+    shutil.copy(os.path.join(PROJECT_ROOT, "template.html"), root)
+
+    def build(*extra):
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_main(["--root", root, *extra])
+
+    build()
+    return {
+        "markdown_to_blocks": (len(pages), lambda: [markdown_to_blocks(md) for md in pages]),
+        "block_to_block_type": (len(blocks), lambda: [block_to_block_type(block) for block in blocks]),
+        "scan_blocks": (len(pages), lambda: [list(scan_blocks(md)) for md in pages]),
+        "text_to_textnodes": (len(inline), lambda: [text_to_textnodes(text) for text in inline]),
+        "markdown_to_html_node": (len(pages), lambda: [markdown_to_html_node(md) for md in pages]),
+        "to_html": (len(trees), lambda: [tree.to_html() for tree in trees]),
+        "markdown_to_html": (len(pages), lambda: [markdown_to_html(md) for md in pages]),
+        "parse_document": (len(pages), lambda: [parse_document(md) for md in pages]),
+        "build_full": (len(pages), lambda: build("--force", "--no-cache")),
+        "build_noop": (len(pages), lambda: build()),
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["seconds"] / baseline[name]["seconds"]
+        flag = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"  {name:<24} {ratio:6.2f}x baseline {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the parser and build stages on a synthetic corpus.")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=30)
+    parser.add_argument("--inline-density", type=float, default=0.4)
+    parser.add_argument("--links", type=int, default=5)
+    parser.add_argument("--images", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="run only these scenarios")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a JSON file written by --output")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown ratio above which a scenario is a regression")
+    args = parser.parse_args()
+
+    spec = CorpusSpec(args.pages, args.blocks, None, args.inline_density, args.links, args.images, args.seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (units, func) in scenarios(spec, tmp).items():
+            if args.only and name not in args.only:
+                continue
+            seconds = best_of(args.repeat, func)
+            results[name] = {"seconds": seconds, "units": units, "per_second": units / seconds}
+            print(f"{name:<24} {seconds * 1000:10.2f} ms  {units / seconds:12.1f} /s")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": spec.to_dict(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if baseline["corpus"] != report["corpus"]:
+            print("warning: baseline was recorded on a different corpus")
+        print(f"Compared with {args.baseline}:")
+        if compare(results, baseline["results"], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
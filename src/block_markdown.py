@@ -8,13 +8,66 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
+HEADING_PREFIXES = tuple("#" * i + " " for i in range(1, 7))
+
+def scan_blocks(markdown):
+    lines = markdown.split("\n")
+    n = len(lines)
+    i = 0
+    while i < n:
+        if not lines[i].strip():
+            i += 1
+            continue
+
+        first = lines[i].lstrip()
+        if first.startswith("```"):
+            # A fence runs to the next line ending in ```, blank lines
+            # included; one that never closes is read as an ordinary block.
+            end = i if len(first.rstrip()) >= 6 and first.rstrip().endswith("```") else i + 1
+            while end < n and not lines[end].rstrip().endswith("```"):
+                end += 1
+            if end < n:
+                block = [first] + lines[i + 1:end + 1]
+                block[-1] = block[-1].rstrip()
+                yield BlockType.CODE, block
+                i = end + 1
+                continue
+
+        quote = unordered = ordered = True
+        block = []
+        while i < n:
+            line = first if not block else lines[i]
+            i += 1
+            last = i == n or not lines[i].strip()
+            if last:
+                line = line.rstrip()
+            block.append(line)
+            if quote and not line.startswith(">"):
+                quote = False
+            if unordered and not line.startswith("- "):
+                unordered = False
+            if ordered and not line.startswith(f"{len(block)}. "):
+                ordered = False
+            if last:
+                break
+
+        # Classified from the stripped block, like block_to_block_type:
+        # "# " on its own is a paragraph "#", not an empty heading.
+        if block[0].startswith(HEADING_PREFIXES):
+            yield BlockType.HEADING, block
+        elif block[0].startswith("```") and block[-1].endswith("```"):
+            yield BlockType.CODE, block
+        elif quote:
+            yield BlockType.QUOTE, block
+        elif unordered:
+            yield BlockType.UNORDERED_LIST, block
+        elif ordered:
+            yield BlockType.ORDERED_LIST, block
+        else:
+            yield BlockType.PARAGRAPH, block
+
 def markdown_to_blocks(markdown):
-    new_blocks = []
-    blocks = markdown.split("\n\n")
-    for block in blocks:
-        if block := block.strip():
-            new_blocks.append(block)
-    return new_blocks
+    return ["\n".join(lines) for _, lines in scan_blocks(markdown)]
 
 def block_to_block_type(block):
     for i in range(1,7):
@@ -35,4 +88,4 @@ def block_to_block_type(block):
     if all(line.startswith(f"{i + 1}. ") for i, line in enumerate(lines)):
         return BlockType.ORDERED_LIST
 
-    return BlockType.PARAGRAPH
\ No newline at end of file
+    return BlockType.PARAGRAPH
@@ -0,0 +1,104 @@
+import errno
+import json
+import os
+import time
+
+CACHE_NAME = ".ssg-cache"
+# Bump whenever the markdown renderer's output changes so entries written by
+# an older parser are never served; evict() deletes their directories.
+PARSER_VERSION = 3
+DEFAULT_MAX_BYTES = 64 << 20
+# Temporary files this recent may belong to a build still running, e.g.
+# another --shard process sharing the cache.
+TMP_GRACE_SECONDS = 60
+
+
+class ParseCache:
+    # Rendered page bodies keyed by source content hash, one JSON file per
+    # entry under <root>/v<PARSER_VERSION>/. Entries are written atomically,
+    # so worker processes can share the directory without locking, and a
+    # hit touches the file so eviction can drop the least recently used.
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        # Normalized so evict() can compare the paths os.walk yields with
+        # self.dir; "./.ssg-cache" would otherwise never match.
+        self.root = os.path.normpath(root)
+        self.max_bytes = max_bytes
+        self.dir = os.path.join(self.root, f"v{PARSER_VERSION}")
+
+    def path(self, source_hash):
+        return os.path.join(self.dir, source_hash[:2], source_hash + ".json")
+
+    def get(self, source_hash):
+        path = self.path(source_hash)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return data
+
+    def put(self, source_hash, data):
+        path = self.path(source_hash)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        for attempt in range(2):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f)
+                break
+            except FileNotFoundError:
+                # A concurrent evict() removed the still-empty directory.
+                if attempt:
+                    raise
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        # Other builds (e.g. parallel --shard processes) may be evicting the
+        # same directory, so any file or directory can vanish mid-walk.
+        removed = 0
+        if not os.path.isdir(self.root):
+            return removed
+        entries = []
+        for dir_path, dir_names, file_names in os.walk(self.root, topdown=False):
+            current = os.path.commonpath([dir_path, self.dir]) == self.dir
+            for name in file_names:
+                path = os.path.join(dir_path, name)
+                if name.endswith(".tmp"):
+                    try:
+                        if time.time() - os.path.getmtime(path) < TMP_GRACE_SECONDS:
+                            continue
+                    except FileNotFoundError:
+                        continue
+                if not current or not name.endswith(".json"):
+                    removed += remove_entry(path)
+                    continue
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+            if dir_path != self.root:
+                try:
+                    os.rmdir(dir_path)
+                except OSError as e:
+                    if e.errno not in (errno.ENOENT, errno.ENOTEMPTY, errno.EEXIST):
+                        raise
+
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            removed += remove_entry(path)
+            total -= size
+        return removed
+
+
+def remove_entry(path):
+    # 1 if this call removed path, 0 if someone else got there first.
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return 0
+    return 1
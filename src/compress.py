@@ -0,0 +1,108 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt")
+SIDECAR_EXTENSIONS = (".gz", ".zst")
+DEFAULT_LEVEL = 9
+DEFAULT_MIN_SIZE = 1024
+
+
+def gzip_compress(data, level):
+    # mtime=0 keeps the sidecar byte-identical across builds.
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def zstd_compress(data, level):
+    return zstd.compress(data, level)
+
+FORMATS = {"gz": gzip_compress}
+if zstd is not None:
+    FORMATS["zst"] = zstd_compress
+
+
+def remove_sidecars(path):
+    removed = 0
+    for ext in SIDECAR_EXTENSIONS:
+        if os.path.isfile(path + ext):
+            os.remove(path + ext)
+            removed += 1
+    return removed
+
+
+class Compressor:
+    # Writes precompressed sidecars (index.html.gz, ...) next to text
+    # outputs. A sidecar's mtime is set to its file's, so a file whose
+    # sidecars are missing or carry another mtime is known to need them.
+    def __init__(self, formats=("gz",), level=DEFAULT_LEVEL, min_size=DEFAULT_MIN_SIZE, jobs=1):
+        for name in formats:
+            if name not in FORMATS:
+                raise ValueError(f"Unsupported compression format: {name} (available: {', '.join(FORMATS)})")
+        self.formats = tuple(formats)
+        self.extensions = tuple("." + name for name in formats)
+        self.level = level
+        self.min_size = min_size
+        self.jobs = jobs
+
+    def is_current(self, path, st):
+        for ext in self.extensions:
+            try:
+                if os.stat(path + ext).st_mtime_ns != st.st_mtime_ns:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+    def candidates(self, root, changed=()):
+        # Files written this build, plus any whose sidecars are missing or
+        # stale (e.g. the first build with compression turned on).
+        changed = {os.path.normpath(path) for path in changed}
+        paths = []
+        for dir_path, dir_names, file_names in os.walk(root):
+            for name in file_names:
+                # Dotfiles such as the build manifest are not served.
+                if name.startswith(".") or not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                    continue
+                path = os.path.join(dir_path, name)
+                if os.path.normpath(path) in changed:
+                    paths.append(path)
+                    continue
+                st = os.stat(path)
+                if st.st_size >= self.min_size and not self.is_current(path, st):
+                    paths.append(path)
+        return sorted(paths)
+
+    def compress_file(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        st = os.stat(path)
+        written = 0
+        for name, ext in zip(self.formats, self.extensions):
+            sidecar = path + ext
+            compressed = FORMATS[name](data, self.level) if len(data) >= self.min_size else None
+            # A sidecar that would not be smaller is worse than none, and a
+            # leftover one from a bigger version of the file would be stale.
+            if compressed is None or len(compressed) >= len(data):
+                if os.path.isfile(sidecar):
+                    os.remove(sidecar)
+                continue
+            tmp_path = sidecar + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            os.replace(tmp_path, sidecar)
+            written += 1
+        return written
+
+    def run(self, root, changed=()):
+        paths = self.candidates(root, changed)
+        if self.jobs <= 1 or len(paths) <= 1:
+            return sum(map(self.compress_file, paths))
+        # zlib releases the GIL while compressing, so threads scale here
+        # without pickling file contents to worker processes.
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            return sum(executor.map(self.compress_file, paths))
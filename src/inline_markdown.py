@@ -19,57 +19,81 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
                 new_nodes.append(TextNode(segments[i], text_type))
     return new_nodes
 
-def split_nodes_image(old_nodes):
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+def split_nodes_pattern(old_nodes, pattern, text_type):
+    # Walks the match spans in one pass; splitting the remaining text on
+    # each match re-copied it every time and went quadratic on long lists.
     new_nodes = []
     for node in old_nodes:
         if node.text_type is not TextType.TEXT:
             new_nodes.append(node)
             continue
-        markdown_images = extract_markdown_images(node.text)
-        remaining_text = node.text
-        for alt, url in markdown_images:
-            sections = remaining_text.split(f"![{alt}]({url})", 1)
-            if sections[0]:
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(alt, TextType.IMAGE, url))
-            remaining_text = sections[1]
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
-
+        text = node.text
+        pos = 0
+        for match in pattern.finditer(text):
+            if match.start() > pos:
+                new_nodes.append(TextNode(text[pos:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            pos = match.end()
+        if pos < len(text):
+            new_nodes.append(TextNode(text[pos:], TextType.TEXT))
     return new_nodes
+
+def split_nodes_image(old_nodes):
+    return split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
+
 def split_nodes_link(old_nodes):
-    new_nodes = []
-    for node in old_nodes:
-        if node.text_type is not TextType.TEXT:
-            new_nodes.append(node)
-            continue
-        markdown_links = extract_markdown_links(node.text)
-        remaining_text = node.text
-        for value, url in markdown_links:
-            sections = remaining_text.split(f"[{value}]({url})", 1)
-            if sections[0]:
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(value, TextType.ANCHOR, url))
-            remaining_text = sections[1]
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
+    return split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.ANCHOR)
 
-    return new_nodes
+INLINE_LINK_PATTERN = re.compile(r"!?\[([^\[\]]*)\]\(([^\(\)]*)\)")
+DELIMITER_PATTERN = re.compile(r"\*\*|_|`")
+DELIMITER_TYPES = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
 
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    return nodes
+    return scan_inline(text, TextNode)
 
+def scan_inline(text, make):
+    # make(text, text_type, url) builds each output item: TextNode for the
+    # node tree, or an HTML string for the fused markdown_to_html path.
+    items = []
+    pos = 0
+    if "[" in text:
+        for match in INLINE_LINK_PATTERN.finditer(text):
+            start = match.start()
+            scan_delimited(text, pos, start, items, make)
+            if text[start] == "!":
+                items.append(make(match.group(1), TextType.IMAGE, match.group(2)))
+            else:
+                items.append(make(match.group(1), TextType.ANCHOR, match.group(2)))
+            pos = match.end()
+    scan_delimited(text, pos, len(text), items, make)
+    return items
+
+def scan_delimited(text, start, end, items, make):
+    pos = start
+    while match := DELIMITER_PATTERN.search(text, pos, end):
+        delimiter = match.group()
+        open_start, open_end = match.span()
+        close = text.find(delimiter, open_end, end)
+        if close == -1:
+            raise Exception(f"No matching {delimiter} found, invalid syntax")
+        # A span may not contain a delimiter that binds tighter than its own
+        # (** over _ over `), matching the old one-pass-per-delimiter order.
+        if delimiter != "**":
+            if text.find("**", open_end, close) != -1 or (delimiter == "`" and text.find("_", open_end, close) != -1):
+                raise Exception(f"No matching {delimiter} found, invalid syntax")
+        if open_start > pos:
+            items.append(make(text[pos:open_start], TextType.TEXT, None))
+        if close > open_end:
+            items.append(make(text[open_end:close], DELIMITER_TYPES[delimiter], None))
+        pos = close + len(delimiter)
+    if end > pos:
+        items.append(make(text[pos:end], TextType.TEXT, None))
 
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    return re.findall(pattern, text)
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    return re.findall(pattern, text)
\ No newline at end of file
+    return LINK_PATTERN.findall(text)
\ No newline at end of file
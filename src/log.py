@@ -0,0 +1,70 @@
+import logging
+import sys
+import time
+
+logger = logging.getLogger("ssg")
+
+QUIET = logging.WARNING
+NORMAL = logging.INFO
+VERBOSE = logging.DEBUG
+
+
+class BufferedHandler(logging.StreamHandler):
+    # StreamHandler writes and flushes every record; with a line per file on
+    # a large site that is a syscall per line. Per-file (debug) lines are
+    # batched and written every `interval` seconds, anything at info level
+    # or above flushes them immediately so the order is kept.
+    def __init__(self, stream=None, interval=0.5):
+        super().__init__(stream)
+        self.interval = interval
+        self.lines = []
+        self.last_flush = time.monotonic()
+
+    def emit(self, record):
+        try:
+            self.lines.append(self.format(record) + self.terminator)
+            if record.levelno > logging.DEBUG or time.monotonic() - self.last_flush >= self.interval:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self.lines:
+                self.stream.write("".join(self.lines))
+                self.lines.clear()
+            super().flush()
+            self.last_flush = time.monotonic()
+        finally:
+            self.release()
+
+
+def configure_logging(level=NORMAL, stream=None):
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    handler = BufferedHandler(stream if stream is not None else sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return handler
+
+
+class Progress:
+    # A "Pages: 120/500" counter logged at most once per `interval` seconds
+    # and once at the end, so CI logs get a few lines rather than one per page.
+    def __init__(self, total, label, interval=1.0):
+        self.total = total
+        self.label = label
+        self.interval = interval
+        self.done = 0
+        self.last_report = time.monotonic()
+
+    def advance(self, count=1):
+        self.done += count
+        now = time.monotonic()
+        if self.done >= self.total or now - self.last_report >= self.interval:
+            self.last_report = now
+            logger.info("%s: %d/%d", self.label, self.done, self.total)
@@ -1,21 +1,182 @@
+import argparse
+import glob
 import os
 import sys
-from utils import copy_source_to_target, generate_pages_recursive
+from cache import CACHE_NAME, DEFAULT_MAX_BYTES, ParseCache
+from compress import DEFAULT_LEVEL, DEFAULT_MIN_SIZE, Compressor
+from log import NORMAL, QUIET, VERBOSE, configure_logging, logger
+from manifest import BuildManifest
+from pipeline import DEFAULT_IO_DEPTH, generate_pages_async
+from markdown import block_cache
+from plan import BuildPlan
+from profiler import profiler, slowest_pages, write_profile
+from schedule import estimate_costs, format_plan
+from shard import merge_shards, parse_shard, shard_dir, shard_plan, write_shard_manifest
+from stats import BuildStats
+from template import Template
+from utils import ASSET_MANIFEST_NAME, discover_page_targets, fingerprint_asset, generate_pages_targets, job_is_stale, sync_source_to_target
+from watch import watch
 
 
-def main():
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+def parse_target(value, project_root):
+    basepath, sep, directory = value.partition("=")
+    if not sep or not basepath or not directory:
+        raise ValueError(f"--target expects BASEPATH=DIR, got {value!r}")
+    return basepath, os.path.join(project_root, directory)
 
-    script_dir = os.path.dirname(__file__)
-    project_root = os.path.join(script_dir, "..")
+def merge_main(argv):
+    parser = argparse.ArgumentParser(prog="main.py merge", description="Combine the outputs of --shard builds into one site, checking that no shard is missing or failed.")
+    parser.add_argument("shards", nargs="*", help="shard output directories (default: every OUT-shard-I-of-N under --root)")
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(__file__), ".."), help="project directory the shards and OUT are relative to")
+    parser.add_argument("--out", default="docs", help="directory to merge into (relative to --root)")
+    args = parser.parse_args(argv)
+    configure_logging(NORMAL)
+    dest = os.path.join(args.root, args.out)
+    shards = [os.path.join(args.root, path) for path in args.shards] or sorted(glob.glob(f"{os.path.normpath(dest)}-shard-*-of-*"))
+    if not shards:
+        parser.error(f"no shard directories found next to {args.out}")
+    try:
+        stats = merge_shards(shards, dest)
+    except ValueError as e:
+        logger.error("Cannot merge: %s", e)
+        sys.exit(1)
+    logger.info("Merged %d shards into %s: copied %d files, %d unchanged, removed %d", len(shards), os.path.relpath(dest), stats.assets_copied, stats.assets_unchanged, stats.assets_removed)
+    return stats
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "merge":
+        return merge_main(argv[1:])
+    parser = argparse.ArgumentParser(description="Build the site from content/ and static/ into docs/ (or `main.py merge` to combine --shard builds).")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served under")
+    parser.add_argument("--target", action="append", metavar="BASEPATH=DIR", help="build for BASEPATH into DIR (relative to --root) instead of BASEPATH into docs/; repeat to parse each page once and write several sites")
+    parser.add_argument("--force", action="store_true", help="wipe docs/ and rebuild every page and asset")
+    parser.add_argument("--hash-assets", action="store_true", help="compare static assets by content hash instead of size and mtime")
+    parser.add_argument("--link-assets", action="store_true", help="hardlink static assets into docs/ instead of copying them")
+    parser.add_argument("--shard", metavar="I/N", help="build only the I-th of N stable, disjoint slices of the pages and assets into DIR-shard-I-of-N, with a shard manifest for `main.py merge`")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="render pages across N worker processes (0 = one per CPU)")
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(__file__), ".."), help="project directory holding content/, static/ and template.html")
+    parser.add_argument("--plan", action="store_true", help="print the pages a build would render, their predicted cost and the critical path across --jobs workers, without writing anything")
+    parser.add_argument("--profile", nargs="?", const="profile.json", metavar="FILE", help="write per-page and per-stage timings to FILE (default profile.json) plus a Chrome trace")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N", help="number of slowest pages to list with --profile")
+    parser.add_argument("--block-cache", type=int, default=0, metavar="N", help="memoize up to N rendered blocks per process for content repeated across pages (0 = off)")
+    parser.add_argument("--no-cache", action="store_true", help=f"do not read or write the parsed-page cache in {CACHE_NAME}/")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES >> 20, metavar="MB", help="evict least recently used parse cache entries beyond this size")
+    parser.add_argument("--async-io", action="store_true", help="overlap source reads and output writes with rendering (for slow or network filesystems)")
+    parser.add_argument("--io-depth", type=int, default=DEFAULT_IO_DEPTH, metavar="N", help="pages in flight per --async-io stage")
+    parser.add_argument("--fingerprint", action="store_true", help="copy static assets under content-hashed names, rewrite references to them and write docs/assets.json")
+    parser.add_argument("--compress", nargs="?", const="gz", metavar="FORMATS", help="write precompressed sidecars for changed HTML/CSS/JS outputs; comma-separated formats (default gz; zst where Python provides it)")
+    parser.add_argument("--compress-level", type=int, default=DEFAULT_LEVEL, metavar="N", help="compression level for --compress")
+    parser.add_argument("--compress-min-size", type=int, default=DEFAULT_MIN_SIZE, metavar="BYTES", help="leave files smaller than this uncompressed")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="only report errors")
+    verbosity.add_argument("-v", "--verbose", action="store_true", help="log every page and asset as it is processed")
+    parser.add_argument("--watch", action="store_true", help="serve docs/ with live reload and rebuild on changes")
+    parser.add_argument("--port", type=int, default=8888, help="port for the --watch dev server")
+    parser.add_argument("--poll-interval", type=float, default=0.05, help="seconds between --watch filesystem polls")
+    args = parser.parse_args(argv)
+    configure_logging(QUIET if args.quiet else VERBOSE if args.verbose else NORMAL)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    compressor = None
+    if args.compress is not None:
+        try:
+            compressor = Compressor(args.compress.split(","), args.compress_level, args.compress_min_size, jobs)
+        except ValueError as e:
+            parser.error(str(e))
+
+    project_root = args.root
 
     static_path = os.path.join(project_root, "static")
-    docs_path = os.path.join(project_root, "docs")
     content_path = os.path.join(project_root, "content")
     template_path = os.path.join(project_root, "template.html")
+    try:
+        targets = [parse_target(value, project_root) for value in args.target or [f"{args.basepath}=docs"]]
+    except ValueError as e:
+        parser.error(str(e))
+    if len({os.path.normpath(directory) for _, directory in targets}) < len(targets):
+        parser.error("each --target needs its own output directory")
+    if len(targets) > 1 and (args.async_io or args.watch):
+        parser.error("--async-io and --watch build a single target")
+    shard = None
+    if args.shard is not None:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.watch:
+            parser.error("--watch builds the whole site, not a shard")
+        targets = [(basepath, shard_dir(directory, *shard)) for basepath, directory in targets]
+    cache = None if args.no_cache else ParseCache(os.path.join(project_root, CACHE_NAME), args.cache_size << 20)
 
-    copy_source_to_target(static_path, docs_path)
-    generate_pages_recursive(content_path, template_path, docs_path, basepath)
+    stats = BuildStats()
+    profiler.set_enabled(args.profile is not None)
+    block_cache.set_maxsize(args.block_cache)
+    # Loaded even with --force: the recorded render times still order the work.
+    manifests = [BuildManifest.load(docs_path) for _, docs_path in targets]
+    sidecars = compressor.extensions if compressor is not None else ()
+    assets = {} if args.fingerprint else None
+    # content/ and static/ are walked once; every later stage works from the plan.
+    with stats.phase("scan"):
+        plan = BuildPlan.scan(content_path, static_path)
+        full_plan = plan
+        if shard is not None:
+            plan = shard_plan(full_plan, *shard)
+            if assets is not None:
+                # Pages link to assets other shards copy, so every shard
+                # needs the whole fingerprint map.
+                for asset in full_plan.assets:
+                    fingerprint_asset(asset, assets)
+    if args.plan:
+        if assets is not None:
+            for asset in plan.assets:
+                fingerprint_asset(asset, assets)
+        templates = [Template.load(template_path, basepath, assets) for basepath, _ in targets]
+        work = discover_page_targets(content_path, [(basepath, docs_path, manifest) for (basepath, docs_path), manifest in zip(targets, manifests)], stats, plan)
+        work = [job for job in work if job_is_stale(job, templates, args.force)]
+        logger.info(format_plan(work, estimate_costs(work, {page.path: page.size for page in plan.pages}), jobs, args.profile_top))
+        return stats
+    with stats.phase("assets"):
+        for (_, docs_path), manifest in zip(targets, manifests):
+            sync_source_to_target(static_path, docs_path, manifest.outputs(), args.hash_assets, args.link_assets, args.force, stats, sidecars, assets, plan)
+    if args.async_io:
+        (basepath, docs_path), = targets
+        generate_pages_async(content_path, template_path, docs_path, basepath, manifests[0], args.force, jobs, stats, cache, args.io_depth, assets, plan)
+    else:
+        page_targets = [(basepath, docs_path, manifest) for (basepath, docs_path), manifest in zip(targets, manifests)]
+        generate_pages_targets(content_path, template_path, page_targets, args.force, jobs, stats, cache, assets, plan)
+    with stats.phase("manifest"):
+        for manifest in manifests:
+            stats.removed += len(manifest.prune())
+            manifest.save()
+    if compressor is not None:
+        with stats.phase("compress"):
+            for _, docs_path in targets:
+                stats.compressed += compressor.run(docs_path, stats.changed_outputs)
+    if shard is not None:
+        outputs = [page.dest_rel_path for page in plan.pages]
+        outputs += [asset.rel_path if assets is None else fingerprint_asset(asset, assets) for asset in plan.assets]
+        if assets is not None:
+            outputs.append(ASSET_MANIFEST_NAME)
+        for _, docs_path in targets:
+            write_shard_manifest(docs_path, *shard, full_plan, plan, outputs, stats.failed)
+    if cache is not None:
+        with stats.phase("cache"):
+            stats.parse_cache_evicted = cache.evict()
+    logger.info(stats.summary())
+    if args.profile is not None:
+        trace_path = write_profile(stats, args.profile)
+        logger.info("Wrote profile to %s and %s", args.profile, trace_path)
+        logger.info("Slowest pages:")
+        for page in slowest_pages(stats, args.profile_top):
+            logger.info("  %8.2f ms  %s", (page["end"] - page["start"]) / 1e6, os.path.relpath(page["source"]))
+    if args.watch:
+        (basepath, docs_path), = targets
+        watch(content_path, static_path, template_path, docs_path, basepath, manifests[0], args.port, args.poll_interval, jobs, cache, compressor, assets)
+        return
+    if stats.failed:
+        sys.exit(1)
+    return stats
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+
+from compress import remove_sidecars
+
+MANIFEST_NAME = ".ssg-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 16):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashingWriter:
+    def __init__(self, fp):
+        self.fp = fp
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, text):
+        data = text.encode()
+        self.digest.update(data)
+        self.size += len(data)
+        self.fp.write(text)
+
+    def writelines(self, fragments):
+        for fragment in fragments:
+            self.write(fragment)
+
+    def hexdigest(self):
+        return self.digest.hexdigest()
+
+
+def make_entry(source_path, source_hash, template_hash, basepath, output_hash, document=None):
+    entry = {
+        "source": os.path.relpath(source_path),
+        "source_hash": source_hash,
+        "template_hash": template_hash,
+        "basepath": basepath,
+        "output_hash": output_hash,
+    }
+    # Title, front matter, word count and links from the parse, so later
+    # steps can use them for skipped pages without re-reading the source.
+    if document is not None:
+        entry["document"] = document
+    return entry
+
+
+def entry_is_fresh(entry, dest_path, source_hash, template_hash, basepath):
+    if entry is None:
+        return False
+    if (entry["source_hash"] != source_hash
+            or entry["template_hash"] != template_hash
+            or entry["basepath"] != basepath):
+        return False
+    if not os.path.isfile(dest_path):
+        return False
+    return hash_file(dest_path) == entry["output_hash"]
+
+
+class BuildManifest:
+    def __init__(self, root, pages=None):
+        self.root = root
+        self.path = os.path.join(root, MANIFEST_NAME)
+        self.pages = pages if pages is not None else {}
+        self.seen = set()
+
+    @classmethod
+    def load(cls, root):
+        try:
+            with open(os.path.join(root, MANIFEST_NAME), "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return cls(root)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(root)
+        return cls(root, data["pages"])
+
+    def key(self, dest_path):
+        return os.path.relpath(dest_path, self.root)
+
+    def get(self, dest_path):
+        key = self.key(dest_path)
+        self.seen.add(key)
+        return self.pages.get(key)
+
+    def update(self, dest_path, entry):
+        key = self.key(dest_path)
+        self.seen.add(key)
+        self.pages[key] = entry
+
+    def outputs(self):
+        return set(self.pages) | {MANIFEST_NAME}
+
+    def remove(self, dest_path):
+        self.pages.pop(self.key(dest_path), None)
+        if os.path.isfile(dest_path):
+            os.remove(dest_path)
+        remove_sidecars(dest_path)
+
+    def prune(self):
+        # Pages whose source disappeared since the last build: forget them
+        # and remove their outputs so the tree matches a clean build.
+        stale = sorted(key for key in self.pages if key not in self.seen)
+        for key in stale:
+            self.remove(os.path.join(self.root, key))
+        return stale
+
+    def save(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "pages": self.pages}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -1,34 +1,298 @@
-from block_markdown import BlockType, markdown_to_blocks, block_to_block_type
+from collections import OrderedDict
+
+from block_markdown import BlockType, scan_blocks
 from htmlnode import ParentNode, LeafNode
-from inline_markdown import text_to_textnodes
-from textnode import text_node_to_html_node
+from inline_markdown import scan_inline, text_to_textnodes
+from profiler import profiler
+from textnode import TextType, text_node_to_html_node, text_to_html
+
+
+class BlockCache:
+    # Bounded LRU of rendered blocks shared by every page in a process.
+    # Keys carry the renderer, block type and exact block text, so a hit
+    # returns what that renderer produced for identical input. Node trees
+    # are shared between pages and must not be mutated after rendering.
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def set_maxsize(self, maxsize):
+        self.maxsize = maxsize
+        while len(self.entries) > max(maxsize, 0):
+            self.entries.popitem(last=False)
+
+    def render(self, renderer, block_type, lines):
+        key = (renderer, block_type, "\n".join(lines))
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = renderer(block_type, lines)
+        self.entries[key] = value
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return value
+
+    def take_counts(self):
+        counts = (self.hits, self.misses)
+        self.hits = self.misses = 0
+        return counts
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+
+block_cache = BlockCache()
 
 
 def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+    with profiler.stage("blocks"):
+        blocks = list(scan_blocks(markdown))
     children = []
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        if block_type == BlockType.PARAGRAPH:
-            children.append(paragraph_to_html_node(block))
-        elif block_type == BlockType.HEADING:
-            children.append(heading_to_html_node(block))
-        elif block_type == BlockType.CODE:
-            children.append(code_to_html_node(block))
-        elif block_type == BlockType.QUOTE:
-            children.append(quote_to_html_node(block))
-        elif block_type == BlockType.UNORDERED_LIST:
-            children.append(unordered_list_to_html_node(block))
-        elif block_type == BlockType.ORDERED_LIST:
-            children.append(ordered_list_to_html_node(block))
+    for block_type, lines in blocks:
+        if block_cache.enabled:
+            children.append(block_cache.render(block_lines_to_html_node, block_type, lines))
+        else:
+            children.append(block_lines_to_html_node(block_type, lines))
 
     return ParentNode("div", children)
 
+def block_lines_to_html_node(block_type, lines):
+    if block_type is BlockType.PARAGRAPH:
+        return paragraph_to_html_node("\n".join(lines))
+    if block_type is BlockType.HEADING:
+        return heading_to_html_node("\n".join(lines))
+    if block_type is BlockType.CODE:
+        return code_to_html_node("\n".join(lines))
+    if block_type is BlockType.QUOTE:
+        return quote_lines_to_html_node(lines)
+    if block_type is BlockType.UNORDERED_LIST:
+        return unordered_list_lines_to_html_node(lines)
+    if block_type is BlockType.ORDERED_LIST:
+        return ordered_list_lines_to_html_node(lines)
+    raise ValueError(f"Unknown block type: {block_type}")
+
+def markdown_to_html(markdown):
+    return "".join(iter_markdown_html(markdown))
+
+def iter_markdown_html(markdown):
+    # Fused fast path: emits exactly markdown_to_html_node(markdown).to_html(),
+    # one fragment per block, without building TextNode or HTMLNode trees.
+    with profiler.stage("blocks"):
+        blocks = list(scan_blocks(markdown))
+    yield "<div>"
+    for block_type, lines in blocks:
+        if block_cache.enabled:
+            yield block_cache.render(block_lines_to_html, block_type, lines)
+        else:
+            yield block_lines_to_html(block_type, lines)
+    yield "</div>"
+
+def block_lines_to_html(block_type, lines, inline=None):
+    if inline is None:
+        inline = inline_html
+    if block_type is BlockType.PARAGRAPH:
+        return "<p>" + inline("\n".join(lines)) + "</p>"
+    if block_type is BlockType.HEADING:
+        block = "\n".join(lines)
+        level = len(block) - len(block.lstrip("#"))
+        return f"<h{level}>" + inline(block[level + 1:]) + f"</h{level}>"
+    if block_type is BlockType.CODE:
+        return "<pre><code>" + "\n".join(lines)[3:-3] + "</code></pre>"
+    if block_type is BlockType.QUOTE:
+        text = "\n".join(line[1:].lstrip() for line in lines)
+        return "<blockquote>" + inline(text) + "</blockquote>"
+    if block_type is BlockType.UNORDERED_LIST:
+        return "<ul>" + "".join("<li>" + inline(line[2:]) + "</li>" for line in lines) + "</ul>"
+    if block_type is BlockType.ORDERED_LIST:
+        return "<ol>" + "".join("<li>" + inline(line.split(". ", 1)[1]) + "</li>" for line in lines) + "</ol>"
+    raise ValueError(f"Unknown block type: {block_type}")
+
+# Root-relative link and image URLs in Document.html are wrapped in this
+# marker so each output target can resolve them (basepath, fingerprinted
+# assets) without rewriting text. Source NULs become U+FFFD, as browsers
+# would render them anyway, so the marker cannot come from content.
+URL_MARK = "\x00"
+
+class Document:
+    __slots__ = ("title", "metadata", "html", "word_count", "links", "images")
+
+    def __init__(self, title, metadata, html, word_count=0, links=(), images=()):
+        self.title = title
+        self.metadata = metadata
+        self.html = html
+        self.word_count = word_count
+        self.links = list(links)
+        self.images = list(images)
+
+    def __repr__(self):
+        return f"Document({self.title!r}, {self.metadata!r}, {len(self.html)} chars, {self.word_count} words)"
+
+    def body(self, resolve_url=None):
+        # Yields the rendered HTML with each marked URL passed through
+        # resolve_url (or left as is), as slices between the markers so
+        # no target holds a second copy of the whole page.
+        html = self.html
+        pos = 0
+        while (start := html.find(URL_MARK, pos)) != -1:
+            end = html.index(URL_MARK, start + 1)
+            yield html[pos:start]
+            url = html[start + 1:end]
+            yield url if resolve_url is None else resolve_url(url)
+            pos = end + 1
+        yield html[pos:]
+
+    def to_html(self, resolve_url=None):
+        return "".join(self.body(resolve_url))
+
+    def info(self):
+        return {
+            "title": self.title,
+            "metadata": self.metadata,
+            "word_count": self.word_count,
+            "links": self.links,
+            "images": self.images,
+        }
+
+    def to_dict(self):
+        data = self.info()
+        data["html"] = self.html
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["title"], data["metadata"], data["html"], data["word_count"], data["links"], data["images"])
+
+def parse_document(markdown):
+    # One pass over the source: front matter, then the same blocks
+    # iter_markdown_html renders, with title, word count and outbound
+    # links gathered from each block as it is rendered.
+    if URL_MARK in markdown:
+        markdown = markdown.replace(URL_MARK, "\ufffd")
+    metadata, body = split_front_matter(markdown)
+    with profiler.stage("blocks"):
+        blocks = list(scan_blocks(body))
+    fragments = ["<div>"]
+    titles = []
+    word_count = 0
+    links = []
+    images = []
+    for block_type, lines in blocks:
+        if block_cache.enabled:
+            html, title, words, block_links, block_images = block_cache.render(render_block, block_type, lines)
+        else:
+            html, title, words, block_links, block_images = render_block(block_type, lines)
+        fragments.append(html)
+        if title is not None:
+            titles.append(title)
+        word_count += words
+        links.extend(block_links)
+        images.extend(block_images)
+    fragments.append("</div>")
+
+    if len(titles) > 1:
+        raise ValueError("Only one title allowed per document")
+    if titles:
+        title = titles[0]
+    elif "title" in metadata:
+        title = str(metadata["title"])
+    else:
+        raise ValueError("No title (h1 header) found")
+    return Document(title, metadata, "".join(fragments), word_count, links, images)
+
+def render_block(block_type, lines):
+    # Returns (html, h1 title or None, word count, links, images) for one
+    # block; a tuple so the block cache can hold it like a plain fragment.
+    words = 0
+    links = []
+    images = []
+    plain = []
+
+    def make(text, text_type, url):
+        if text_type is TextType.ANCHOR:
+            links.append(url)
+        elif text_type is TextType.IMAGE:
+            images.append(url)
+            return text_to_html(text, text_type, URL_MARK + url + URL_MARK if url.startswith("/") else url)
+        plain.append(text)
+        if text_type is TextType.ANCHOR and url.startswith("/"):
+            url = URL_MARK + url + URL_MARK
+        return text_to_html(text, text_type, url)
+
+    def inline(text):
+        nonlocal words
+        with profiler.stage("inline"):
+            html = "".join(scan_inline(text, make))
+        words += len("".join(plain).split())
+        plain.clear()
+        return html
+
+    html = block_lines_to_html(block_type, lines, inline)
+    title = None
+    if block_type is BlockType.HEADING and lines[0].startswith("# "):
+        title = lines[0][2:].strip()
+    elif block_type is BlockType.CODE:
+        words = len("\n".join(lines)[3:-3].split())
+    return html, title, words, tuple(links), tuple(images)
+
+def split_front_matter(markdown):
+    # Front matter is an optional block of "key: value" lines fenced by
+    # "---" lines at the very top of the file. Without a closing fence the
+    # whole file is treated as markdown.
+    if not markdown.startswith("---\n"):
+        return {}, markdown
+    pos = 4
+    while True:
+        end = markdown.find("\n", pos)
+        line = markdown[pos:] if end == -1 else markdown[pos:end]
+        if line.rstrip() == "---":
+            return parse_front_matter(markdown[4:pos]), "" if end == -1 else markdown[end + 1:]
+        if end == -1:
+            return {}, markdown
+        pos = end + 1
+
+def parse_front_matter(text):
+    metadata = {}
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, sep, value = line.partition(":")
+        if not sep or not key.strip():
+            raise ValueError(f"Invalid front matter line: {line}")
+        metadata[key.strip()] = parse_front_matter_value(value.strip())
+    return metadata
+
+def parse_front_matter_value(value):
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_front_matter_value(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value in ("true", "false"):
+        return value == "true"
+    if value.isdigit():
+        return int(value)
+    return value
+
+def inline_html(text):
+    with profiler.stage("inline"):
+        return "".join(scan_inline(text, text_to_html))
+
 def text_to_children(text):
-    text_nodes = text_to_textnodes(text)
-    children = []
-    for text_node in text_nodes:
-        children.append(text_node_to_html_node(text_node))
+    with profiler.stage("inline"):
+        text_nodes = text_to_textnodes(text)
+        children = []
+        for text_node in text_nodes:
+            children.append(text_node_to_html_node(text_node))
     return children
 
 def paragraph_to_html_node(block):
@@ -52,7 +316,9 @@ def code_to_html_node(block):
     return ParentNode("pre", [code_node])
 
 def quote_to_html_node(block):
-    lines = block.split("\n")
+    return quote_lines_to_html_node(block.split("\n"))
+
+def quote_lines_to_html_node(lines):
     stripped = []
     for line in lines:
         stripped.append(line[1:].lstrip())
@@ -61,7 +327,9 @@ def quote_to_html_node(block):
     return ParentNode("blockquote", children)
 
 def unordered_list_to_html_node(block):
-    lines = block.split("\n")
+    return unordered_list_lines_to_html_node(block.split("\n"))
+
+def unordered_list_lines_to_html_node(lines):
     li_nodes = []
     for line in lines:
         text = line[2:]
@@ -70,7 +338,9 @@ def unordered_list_to_html_node(block):
     return ParentNode("ul", li_nodes)
 
 def ordered_list_to_html_node(block):
-    lines = block.split("\n")
+    return ordered_list_lines_to_html_node(block.split("\n"))
+
+def ordered_list_lines_to_html_node(lines):
     li_nodes = []
     for line in lines:
         text = line.split(". ", 1)[1]
@@ -0,0 +1,151 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from manifest import hash_bytes, make_entry
+from markdown import block_cache
+from profiler import profiler
+from stats import BuildStats
+from template import Template
+from log import Progress
+from utils import PageResult, commit_output, discover_pages, init_worker, load_document, read_page, report_page
+
+DEFAULT_IO_DEPTH = 16
+
+
+def read_stage(result, previous, template, force=False):
+    try:
+        return read_page(result, previous, template, force)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return None
+
+def render_source(result, markdown, source_hash, template, cache=None):
+    # The CPU half of build_page_targets: the filled template is kept as a string
+    # on the result for the writer stage to flush.
+    start = time.perf_counter_ns()
+    try:
+        document = load_document(result, markdown, source_hash, cache)
+        result.output = template.render_document(document)
+        data = result.output.encode()
+        result.size = len(data)
+        result.entry = make_entry(result.from_path, source_hash, template.hash, template.basepath,
+                                  hash_bytes(data), document.info())
+        result.entry["render_ms"] = round((time.perf_counter_ns() - start) / 1e6, 3)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    if block_cache.enabled:
+        result.cache_counts = block_cache.take_counts()
+    return result
+
+def write_output(result):
+    try:
+        dest_dir = os.path.dirname(result.dest_path)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+        tmp_path = result.dest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(result.output)
+        result.changed = commit_output(tmp_path, result.dest_path, result.entry["output_hash"])
+        result.built = True
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.output = None
+    return result
+
+def add_stage(result, name, start):
+    if result.profile is not None:
+        result.profile["stages"][name] = time.perf_counter_ns() - start
+
+
+async def run_pipeline(work, template, force, cache, depth, io_pool, render_pool, renderers, on_result):
+    # read -> render -> write, each stage connected by a queue of at most
+    # `depth` pages so a slow writer holds back readers instead of letting
+    # rendered pages pile up in memory. Results are handed to on_result in
+    # work order, like the serial build.
+    loop = asyncio.get_running_loop()
+    jobs = iter(enumerate(work))
+    sources = asyncio.Queue(depth)
+    outputs = asyncio.Queue(depth)
+    finished = {}
+    next_index = 0
+
+    async def reader():
+        for index, (from_path, dest_path, previous) in jobs:
+            result = PageResult(from_path, dest_path)
+            start = time.perf_counter_ns()
+            if profiler.enabled:
+                result.profile = {"source": from_path, "pid": os.getpid(), "start": start, "end": start, "stages": {}}
+            source = await loop.run_in_executor(io_pool, read_stage, result, previous, template, force)
+            add_stage(result, "read", start)
+            await sources.put((index, result, source))
+
+    async def renderer():
+        while (item := await sources.get()) is not None:
+            index, result, source = item
+            if source is not None:
+                start = time.perf_counter_ns()
+                if render_pool is None:
+                    result = render_source(result, *source, template, cache)
+                else:
+                    result = await loop.run_in_executor(render_pool, render_source, result, *source, template, cache)
+                add_stage(result, "render", start)
+            await outputs.put((index, result))
+            # Rendering in-process never awaits; yield so finished reads and
+            # writes are picked up between pages.
+            await asyncio.sleep(0)
+
+    async def writer():
+        nonlocal next_index
+        while (item := await outputs.get()) is not None:
+            index, result = item
+            if result.output is not None:
+                start = time.perf_counter_ns()
+                await loop.run_in_executor(io_pool, write_output, result)
+                add_stage(result, "write", start)
+            if result.profile is not None:
+                result.profile["end"] = time.perf_counter_ns()
+            finished[index] = result
+            while next_index in finished:
+                on_result(finished.pop(next_index))
+                next_index += 1
+
+    readers = [asyncio.create_task(reader()) for _ in range(depth)]
+    render_tasks = [asyncio.create_task(renderer()) for _ in range(renderers)]
+    writers = [asyncio.create_task(writer()) for _ in range(depth)]
+    await asyncio.gather(*readers)
+    for _ in render_tasks:
+        await sources.put(None)
+    await asyncio.gather(*render_tasks)
+    for _ in writers:
+        await outputs.put(None)
+    await asyncio.gather(*writers)
+
+
+def generate_pages_async(dir_path_content, template_path, dest_dir_path, basepath, manifest=None, force=False, jobs=1, stats=None, cache=None, depth=DEFAULT_IO_DEPTH, assets=None, plan=None):
+    if stats is None:
+        stats = BuildStats()
+    work = discover_pages(dir_path_content, dest_dir_path, manifest, stats, plan)
+
+    template = Template.load(template_path, basepath, assets)
+    progress = Progress(len(work), "Pages")
+
+    def on_result(result):
+        report_page(result, manifest, stats)
+        progress.advance()
+
+    with stats.phase("pages"):
+        render_pool = None
+        if jobs > 1:
+            render_pool = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(profiler.enabled, block_cache.maxsize))
+        try:
+            with ThreadPoolExecutor(max_workers=2 * depth) as io_pool:
+                asyncio.run(run_pipeline(work, template, force, cache, depth, io_pool, render_pool, max(jobs, 1), on_result))
+        finally:
+            if render_pool is not None:
+                render_pool.shutdown()
+    # Stage timers from concurrent reads and writes share one accumulator;
+    # the pipeline times its own stages per page instead.
+    profiler.take_totals()
+    return stats
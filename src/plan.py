@@ -0,0 +1,77 @@
+import os
+
+from log import logger
+
+
+class SourceFile:
+    __slots__ = ("path", "rel_path", "dest_rel_path", "size", "mtime_ns")
+
+    def __init__(self, path, rel_path, dest_rel_path, size, mtime_ns):
+        self.path = path
+        self.rel_path = rel_path
+        self.dest_rel_path = dest_rel_path
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @classmethod
+    def from_entry(cls, entry, rel_path, dest_rel_path):
+        st = entry.stat()
+        return cls(entry.path, rel_path, dest_rel_path, st.st_size, st.st_mtime_ns)
+
+    def __repr__(self):
+        return f"SourceFile({self.rel_path!r}, {self.size})"
+
+
+def page_dest_name(name):
+    return name.replace(".md", ".html")
+
+
+def sorted_entries(path):
+    with os.scandir(path) as it:
+        return sorted(it, key=lambda entry: entry.name)
+
+
+class BuildPlan:
+    # Every page and static asset of the site, from a single os.scandir walk
+    # of content/ and static/. DirEntry answers is_dir() from the directory
+    # listing and stat() once per file, so later stages get sizes and mtimes
+    # without going back to the filesystem.
+    def __init__(self, pages=(), assets=(), asset_dirs=()):
+        self.pages = list(pages)
+        self.assets = list(assets)
+        self.asset_dirs = list(asset_dirs)
+
+    @classmethod
+    def scan(cls, content_path=None, static_path=None):
+        plan = cls()
+        if content_path is not None:
+            plan.scan_pages(content_path, "")
+        if static_path is not None:
+            plan.scan_assets(static_path, "")
+        return plan
+
+    def scan_pages(self, dir_path, rel_dir):
+        logger.debug("Scanning directory: %s", os.path.relpath(dir_path))
+        for entry in sorted_entries(dir_path):
+            rel_path = os.path.join(rel_dir, entry.name)
+            if entry.is_dir():
+                self.scan_pages(entry.path, rel_path)
+            elif entry.name.endswith(".md"):
+                dest_rel_path = os.path.join(rel_dir, page_dest_name(entry.name))
+                self.pages.append(SourceFile.from_entry(entry, rel_path, dest_rel_path))
+            else:
+                logger.debug("  Skipping non-markdown file: %s", entry.name)
+
+    def scan_assets(self, dir_path, rel_dir):
+        # Files before subdirectories, like os.walk, so assets are copied
+        # in the same order as before.
+        self.asset_dirs.append(rel_dir or ".")
+        subdirs = []
+        for entry in sorted_entries(dir_path):
+            rel_path = os.path.join(rel_dir, entry.name)
+            if entry.is_dir():
+                subdirs.append((entry.path, rel_path))
+            else:
+                self.assets.append(SourceFile.from_entry(entry, rel_path, rel_path))
+        for path, rel_path in subdirs:
+            self.scan_assets(path, rel_path)
@@ -0,0 +1,103 @@
+import json
+import os
+import time
+
+
+class Stage:
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info):
+        self.totals[self.name] = self.totals.get(self.name, 0) + time.perf_counter_ns() - self.start
+
+
+class NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NULL_STAGE = NullStage()
+
+
+class Profiler:
+    # Accumulates nanoseconds per stage name for the page being rendered.
+    # Disabled by default, in which case stage() hands back a shared no-op.
+    def __init__(self):
+        self.enabled = False
+        self.totals = {}
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+
+    def stage(self, name):
+        if not self.enabled:
+            return NULL_STAGE
+        return Stage(self.totals, name)
+
+    def take_totals(self):
+        totals, self.totals = self.totals, {}
+        return totals
+
+
+profiler = Profiler()
+
+
+def slowest_pages(stats, n=10):
+    return sorted(stats.page_profiles, key=lambda page: page["end"] - page["start"], reverse=True)[:n]
+
+
+def profile_report(stats):
+    stage_totals = {}
+    pages = []
+    for page in stats.page_profiles:
+        total = page["end"] - page["start"]
+        stages = dict(page["stages"])
+        stages["other"] = max(0, total - sum(stages.values()))
+        for name, ns in stages.items():
+            stage_totals[name] = stage_totals.get(name, 0) + ns
+        pages.append({
+            "source": os.path.relpath(page["source"]),
+            "total_ms": total / 1e6,
+            "stages_ms": {name: ns / 1e6 for name, ns in stages.items()},
+        })
+    return {
+        "phases_ms": {name: (end - start) / 1e6 for name, start, end in stats.phases},
+        "stages_ms": {name: ns / 1e6 for name, ns in sorted(stage_totals.items())},
+        "pages": pages,
+    }
+
+
+def chrome_trace(stats):
+    starts = [start for _, start, _ in stats.phases] + [page["start"] for page in stats.page_profiles]
+    origin = min(starts, default=0)
+    pid = os.getpid()
+    events = []
+    for name, start, end in stats.phases:
+        events.append({"name": name, "cat": "phase", "ph": "X", "pid": pid, "tid": 0,
+                       "ts": (start - origin) / 1e3, "dur": (end - start) / 1e3})
+    for page in stats.page_profiles:
+        events.append({"name": os.path.relpath(page["source"]), "cat": "page", "ph": "X",
+                       "pid": page["pid"], "tid": 1,
+                       "ts": (page["start"] - origin) / 1e3, "dur": (page["end"] - page["start"]) / 1e3,
+                       "args": {name: ns / 1e6 for name, ns in page["stages"].items()}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_profile(stats, path):
+    with open(path, "w") as f:
+        json.dump(profile_report(stats), f, indent=2)
+    trace_path = os.path.splitext(path)[0] + ".trace.json"
+    with open(trace_path, "w") as f:
+        json.dump(chrome_trace(stats), f)
+    return trace_path
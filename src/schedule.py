@@ -0,0 +1,86 @@
+import heapq
+import os
+
+# Rough render cost of a page with no recorded time, from a synthetic
+# corpus; once some pages have timings the rate is taken from those.
+DEFAULT_MS_PER_KB = 0.15
+# Parallel builds send jobs to workers in batches of about this share of
+# the total cost per worker, so small pages don't pay one round trip each.
+BATCHES_PER_WORKER = 8
+
+
+def recorded_time(targets):
+    # targets is a job's [(dest_path, previous_entry), ...]; any target's
+    # entry carries the time of the whole job.
+    times = [previous["render_ms"] for _, previous in targets if previous is not None and "render_ms" in previous]
+    return max(times) if times else None
+
+
+def estimate_costs(work, sizes):
+    # Predicted milliseconds per job: its render time from the last build
+    # that rendered it, or its source size times the ms/KB rate measured
+    # over the pages that have a time.
+    recorded = [recorded_time(targets) for _, targets in work]
+    timed_ms = sum(ms for ms in recorded if ms is not None)
+    timed_kb = sum(sizes.get(from_path, 0) for (from_path, _), ms in zip(work, recorded) if ms is not None) / 1024
+    ms_per_kb = timed_ms / timed_kb if timed_ms and timed_kb else DEFAULT_MS_PER_KB
+    costs = []
+    for (from_path, _), ms in zip(work, recorded):
+        if ms is None:
+            costs.append((sizes.get(from_path, 0) / 1024 * ms_per_kb, "size"))
+        else:
+            costs.append((ms, "history"))
+    return costs
+
+
+def longest_first(costs):
+    return sorted(range(len(costs)), key=lambda i: -costs[i])
+
+
+def batch_jobs(order, costs, jobs):
+    # Consecutive jobs in longest-first order are grouped until a batch
+    # reaches its share of the total; the big pages at the front each go
+    # out alone, the long tail of small ones in bigger batches.
+    limit = sum(costs) / (jobs * BATCHES_PER_WORKER)
+    batches = []
+    batch, batch_cost = [], 0
+    for index in order:
+        batch.append(index)
+        batch_cost += costs[index]
+        if batch_cost >= limit:
+            batches.append(batch)
+            batch, batch_cost = [], 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def simulate(order, costs, jobs):
+    # Greedy list scheduling, which is what a pool handing the next job to
+    # the first idle worker does. Returns each worker's assigned jobs; the
+    # busiest worker's total is the predicted build time.
+    workers = [(0, worker, []) for worker in range(jobs)]
+    for index in order:
+        load, worker, assigned = heapq.heappop(workers)
+        assigned.append(index)
+        heapq.heappush(workers, (load + costs[index], worker, assigned))
+    return sorted(workers, key=lambda w: w[1])
+
+
+def format_plan(work, costs, jobs, top=10):
+    estimates = [cost for cost, _ in costs]
+    order = longest_first(estimates)
+    workers = simulate(order, estimates, jobs)
+    critical_load, critical_worker, critical_jobs = max(workers)
+    total = sum(estimates)
+    from_history = sum(1 for _, source in costs if source == "history")
+    lines = [f"Plan: {len(work)} pages to render ({from_history} timed by history, {len(work) - from_history} estimated from size)"]
+    if not work:
+        return lines[0]
+    lines.append(f"Total cost {total:.1f} ms across {jobs} workers, predicted build time {critical_load:.1f} ms")
+    lines.append(f"Critical path (worker {critical_worker + 1}, {len(critical_jobs)} pages):")
+    for index in critical_jobs[:top]:
+        lines.append(f"  {estimates[index]:8.2f} ms  {os.path.relpath(work[index][0])}")
+    if len(critical_jobs) > top:
+        lines.append(f"  ... {len(critical_jobs) - top} more")
+    return "\n".join(lines)
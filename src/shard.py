@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+
+from log import logger
+from manifest import MANIFEST_NAME, BuildManifest, hash_file
+from plan import BuildPlan
+from stats import BuildStats
+from utils import copy_asset, remove_orphans
+
+SHARD_MANIFEST_NAME = ".ssg-shard.json"
+
+
+def parse_shard(value):
+    index, sep, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        index = count = 0
+    if not sep or count < 1 or not 1 <= index <= count:
+        raise ValueError(f"--shard expects I/N with 1 <= I <= N, got {value!r}")
+    return index, count
+
+def source_key(kind, rel_path):
+    return f"{kind}/{rel_path.replace(os.sep, '/')}"
+
+def shard_of(key, count):
+    # Stable across machines and Python runs, unlike hash(), so every shard
+    # agrees on the split without talking to the others. 1-based like --shard.
+    digest = hashlib.sha256(key.encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+def plan_sources(plan):
+    return [source_key("content", page.rel_path) for page in plan.pages] + [source_key("static", asset.rel_path) for asset in plan.assets]
+
+def plan_digest(sources):
+    return hashlib.sha256("\n".join(sorted(sources)).encode()).hexdigest()
+
+def shard_plan(plan, index, count):
+    return BuildPlan(
+        [page for page in plan.pages if shard_of(source_key("content", page.rel_path), count) == index],
+        [asset for asset in plan.assets if shard_of(source_key("static", asset.rel_path), count) == index],
+        plan.asset_dirs,
+    )
+
+def shard_dir(docs_path, index, count):
+    return f"{os.path.normpath(docs_path)}-shard-{index}-of-{count}"
+
+
+def write_shard_manifest(root, index, count, plan, shard, outputs, failed=()):
+    # What this shard was responsible for, so merge can tell a complete set
+    # of shards from a missing or failed one without rescanning the sources.
+    data = {
+        "shard": index,
+        "count": count,
+        "plan": plan_digest(plan_sources(plan)),
+        "sources": sorted(plan_sources(shard)),
+        "outputs": sorted(path.replace(os.sep, "/") for path in outputs),
+        "failed": sorted(os.path.relpath(path) for path in failed),
+    }
+    path = os.path.join(root, SHARD_MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def load_shard_manifest(root):
+    try:
+        with open(os.path.join(root, SHARD_MANIFEST_NAME), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        raise ValueError(f"{os.path.relpath(root)} has no readable {SHARD_MANIFEST_NAME}; was it built with --shard?")
+
+
+def check_shards(shard_roots):
+    shards = [load_shard_manifest(root) for root in shard_roots]
+    count = shards[0]["count"]
+    digest = shards[0]["plan"]
+    for root, shard in zip(shard_roots, shards):
+        if shard["count"] != count or shard["plan"] != digest:
+            raise ValueError(f"{os.path.relpath(root)} was built from a different split or different sources")
+    indexes = sorted(shard["shard"] for shard in shards)
+    if indexes != list(range(1, count + 1)):
+        missing = sorted(set(range(1, count + 1)) - set(indexes))
+        duplicate = sorted({index for index in indexes if indexes.count(index) > 1})
+        raise ValueError(f"Expected shards 1-{count}, missing {missing or 'none'}, duplicated {duplicate or 'none'}")
+    if plan_digest(source for shard in shards for source in shard["sources"]) != digest:
+        raise ValueError("Shards do not cover every page and asset of the build")
+    for root, shard in zip(shard_roots, shards):
+        if shard["failed"]:
+            raise ValueError(f"Shard {shard['shard']}/{count} failed to build: {', '.join(shard['failed'])}")
+        for rel_path in shard["outputs"]:
+            if not os.path.isfile(os.path.join(root, rel_path)):
+                raise ValueError(f"Shard {shard['shard']}/{count} is missing {rel_path}")
+    return shards
+
+
+def merge_shards(shard_roots, dest, stats=None):
+    # Checks the shards form one complete build, then makes dest hold
+    # exactly their combined outputs and page manifest. Files more than one
+    # shard wrote (e.g. assets.json) must be identical.
+    if stats is None:
+        stats = BuildStats()
+    check_shards(shard_roots)
+    files = {}
+    for root in shard_roots:
+        for dir_path, dir_names, file_names in os.walk(root):
+            for name in file_names:
+                if name in (MANIFEST_NAME, SHARD_MANIFEST_NAME):
+                    continue
+                path = os.path.join(dir_path, name)
+                rel_path = os.path.relpath(path, root)
+                if rel_path in files and hash_file(files[rel_path]) != hash_file(path):
+                    raise ValueError(f"Shards disagree on {rel_path}")
+                files[rel_path] = path
+
+    manifest = BuildManifest(dest)
+    for root in shard_roots:
+        manifest.pages.update(BuildManifest.load(root).pages)
+    for rel_path, source_path in sorted(files.items()):
+        target_path = os.path.join(dest, rel_path)
+        if os.path.isfile(target_path) and hash_file(target_path) == hash_file(source_path):
+            stats.assets_unchanged += 1
+            continue
+        logger.debug("Copying file: %s -> %s", os.path.relpath(source_path), os.path.relpath(target_path))
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        copy_asset(source_path, target_path)
+        stats.assets_copied += 1
+        stats.bytes_written += os.path.getsize(target_path)
+    manifest.save()
+    remove_orphans(dest, set(files) | {MANIFEST_NAME}, stats=stats)
+    return stats
@@ -0,0 +1,61 @@
+import time
+from contextlib import contextmanager
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class BuildStats:
+    def __init__(self):
+        self.built = 0
+        self.changed = 0
+        self.changed_outputs = []
+        self.skipped = 0
+        self.removed = 0
+        self.failed = []
+        self.assets_copied = 0
+        self.assets_unchanged = 0
+        self.assets_removed = 0
+        self.bytes_written = 0
+        self.compressed = 0
+        self.block_cache_hits = 0
+        self.block_cache_misses = 0
+        self.parse_cache_hits = 0
+        self.parse_cache_misses = 0
+        self.parse_cache_evicted = 0
+        self.phases = []
+        self.page_profiles = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start, time.perf_counter_ns()))
+
+    def summary(self):
+        summary = f"Built {self.built} pages ({self.changed} changed on disk), skipped {self.skipped} unchanged, removed {self.removed} stale"
+        if self.failed:
+            summary += f", {len(self.failed)} failed"
+        summary += f"\nCopied {self.assets_copied} assets, {self.assets_unchanged} unchanged, removed {self.assets_removed} orphans"
+        summary += f"\nWrote {format_size(self.bytes_written)}"
+        if self.compressed:
+            summary += f"\nCompressed {self.compressed} sidecars"
+        lookups = self.block_cache_hits + self.block_cache_misses
+        if lookups:
+            summary += f"\nBlock cache: {self.block_cache_hits} hits, {self.block_cache_misses} misses ({self.block_cache_hits / lookups:.0%} hit rate)"
+        if self.parse_cache_hits or self.parse_cache_misses or self.parse_cache_evicted:
+            summary += f"\nParse cache: {self.parse_cache_hits} hits, {self.parse_cache_misses} misses, evicted {self.parse_cache_evicted}"
+        if self.phases:
+            durations = {}
+            for name, start, end in self.phases:
+                durations[name] = durations.get(name, 0) + end - start
+            phases = ", ".join(f"{name} {ns / 1e6:.1f} ms" for name, ns in durations.items())
+            summary += f"\nPhases: {phases} (total {sum(durations.values()) / 1e6:.1f} ms)"
+        return summary
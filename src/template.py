@@ -0,0 +1,88 @@
+import io
+import json
+import re
+
+from manifest import hash_bytes
+
+SLOT_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+URL_ATTRIBUTE_PATTERN = re.compile(r'(href|src)="/([^"]*)"')
+
+
+def rewrite_basepath(html, basepath):
+    if basepath == "/":
+        return html
+    return html.replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
+
+
+def rewrite_urls(html, basepath="/", assets=None):
+    # Like rewrite_basepath, but root-relative URLs found in the asset map
+    # are swapped for their fingerprinted names first.
+    if not assets:
+        return rewrite_basepath(html, basepath)
+
+    def replace(match):
+        url = assets.get("/" + match.group(2), "/" + match.group(2))
+        return f'{match.group(1)}="{basepath}{url[1:]}"'
+
+    return URL_ATTRIBUTE_PATTERN.sub(replace, html)
+
+
+class Template:
+    def __init__(self, source, basepath="/", path=None, assets=None):
+        self.path = path
+        self.basepath = basepath
+        self.assets = assets
+        # Fingerprinted asset names end up in every page, so they are part
+        # of the template's identity for incremental builds.
+        if assets:
+            self.hash = hash_bytes(source.encode() + json.dumps(assets, sort_keys=True).encode())
+        else:
+            self.hash = hash_bytes(source.encode())
+        # segments[i] is the static text before slots[i]; the last segment
+        # follows the last slot. Basepath rewriting of the template's own
+        # links happens here, once, instead of on every rendered page.
+        self.segments = []
+        self.slots = []
+        pos = 0
+        for match in SLOT_PATTERN.finditer(source):
+            self.segments.append(self.rewrite(source[pos:match.start()]))
+            self.slots.append((match.group(1), match.group(0)))
+            pos = match.end()
+        self.segments.append(self.rewrite(source[pos:]))
+
+    @classmethod
+    def load(cls, path, basepath="/", assets=None):
+        with open(path, "r") as f:
+            return cls(f.read(), basepath, path, assets)
+
+    def rewrite(self, html):
+        return rewrite_urls(html, self.basepath, self.assets)
+
+    def resolve_url(self, url):
+        # For a root-relative URL taken from the document structure.
+        if self.assets:
+            url = self.assets.get(url, url)
+        return self.basepath + url[1:]
+
+    def write_document(self, fp, document):
+        # Document URLs are resolved from their markers rather than by
+        # rewriting text, so code samples that mention href="/ survive.
+        self.fill(fp, {"Title": document.title, "Content": document.body(self.resolve_url)})
+
+    def render_document(self, document):
+        buffer = io.StringIO()
+        self.write_document(buffer, document)
+        return buffer.getvalue()
+
+    def fill(self, fp, values):
+        fp.write(self.segments[0])
+        for (name, literal), segment in zip(self.slots, self.segments[1:]):
+            value = values.get(name)
+            if value is None:
+                fp.write(literal)
+            elif isinstance(value, str):
+                fp.write(value)
+            else:
+                fp.writelines(value)
+            fp.write(segment)
+
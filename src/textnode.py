@@ -10,6 +10,8 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -34,4 +36,21 @@ def text_node_to_html_node(text_node):
         return LeafNode("a", text_node.text, {"href": text_node.url})
     if text_node.text_type is TextType.IMAGE:
         return LeafNode("img", text_node.text, {"src": text_node.url, "alt": text_node.text})
-    raise ValueError(f"Invalid text type: {text_node.text_type}")
\ No newline at end of file
+    raise ValueError(f"Invalid text type: {text_node.text_type}")
+
+def text_to_html(text, text_type, url=None):
+    # Same markup text_node_to_html_node(...).to_html() produces, without
+    # the intermediate nodes.
+    if text_type is TextType.TEXT:
+        return text
+    if text_type is TextType.BOLD:
+        return f"<b>{text}</b>"
+    if text_type is TextType.ITALIC:
+        return f"<i>{text}</i>"
+    if text_type is TextType.CODE:
+        return f"<code>{text}</code>"
+    if text_type is TextType.ANCHOR:
+        return f'<a href="{url}">{text}</a>'
+    if text_type is TextType.IMAGE:
+        return f'<img src="{url}" alt="{text}">{text}</img>'
+    raise ValueError(f"Invalid text type: {text_type}")
@@ -1,68 +1,426 @@
+import json
 import os
 import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-from markdown import markdown_to_html_node, extract_title
+from log import Progress, logger
+from manifest import HashingWriter, entry_is_fresh, hash_bytes, hash_file, make_entry
+from markdown import Document, block_cache, parse_document
+from plan import BuildPlan
+from profiler import profiler
+from schedule import batch_jobs, estimate_costs, longest_first
+from stats import BuildStats
+from template import Template
 
 
-def copy_source_to_target(source, target):
-    if os.path.exists(target):
-        print(f"Removing existing directory: {os.path.relpath(target)}/")
+# Files at least this large are copied with os.copy_file_range where the
+# platform has it, which lets copy-on-write filesystems share extents.
+LARGE_FILE_SIZE = 1 << 20
+
+
+def _copy_file_range(source_path, target_path):
+    with open(source_path, "rb") as src, open(target_path, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+    shutil.copystat(source_path, target_path)
+
+def copy_asset(source_path, target_path, link=False, size=None):
+    # Always write beside the target and swap it in: overwriting in place
+    # would write through a hardlink from a previous --link-assets build.
+    tmp_path = target_path + ".tmp"
+    if link:
+        try:
+            os.link(source_path, tmp_path)
+            os.replace(tmp_path, target_path)
+            return
+        except OSError:
+            pass
+    if size is None:
+        size = os.path.getsize(source_path)
+    if hasattr(os, "copy_file_range") and size >= LARGE_FILE_SIZE:
+        try:
+            _copy_file_range(source_path, tmp_path)
+            os.replace(tmp_path, target_path)
+            return
+        except OSError:
+            pass
+    shutil.copy2(source_path, tmp_path)
+    os.replace(tmp_path, target_path)
+
+def asset_is_current(source_path, target_path, use_hash=False, source=None):
+    # source is the asset's SourceFile from a BuildPlan, if there is one;
+    # its size and mtime were read during the scan.
+    try:
+        if source is None:
+            source = os.stat(source_path)
+            size, mtime_ns = source.st_size, source.st_mtime_ns
+        else:
+            size, mtime_ns = source.size, source.mtime_ns
+        target_stat = os.stat(target_path)
+    except FileNotFoundError:
+        return False
+    if size != target_stat.st_size:
+        return False
+    if use_hash:
+        return hash_file(source_path) == hash_file(target_path)
+    return mtime_ns == target_stat.st_mtime_ns
+
+ASSET_MANIFEST_NAME = "assets.json"
+
+
+def fingerprint_path(rel_path, digest):
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:10]}{ext}"
+
+def fingerprint_asset(asset, assets):
+    # Returns the asset's fingerprinted relative path, hashing the file
+    # only if assets does not already map its URL.
+    url = "/" + asset.rel_path.replace(os.sep, "/")
+    if url not in assets:
+        assets[url] = "/" + fingerprint_path(asset.rel_path, hash_file(asset.path)).replace(os.sep, "/")
+    return assets[url][1:].replace("/", os.sep)
+
+def write_asset_manifest(target, assets):
+    # Maps each asset URL to its fingerprinted URL, e.g. for tools that
+    # reference assets from outside the generated pages.
+    path = os.path.join(target, ASSET_MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(assets, f, indent=2, sort_keys=True)
+    with open(tmp_path, "rb") as f:
+        digest = hash_bytes(f.read())
+    return commit_output(tmp_path, path, digest)
+
+def sync_source_to_target(source, target, keep=(), use_hash=False, link=False, clean=False, stats=None, sidecars=(), assets=None, plan=None):
+    # With an assets dict, every asset is copied under a content-hashed
+    # name (index.css -> index.<hash>.css) and assets is filled with the
+    # URL mapping, which is also written to assets.json.
+    if stats is None:
+        stats = BuildStats()
+    if clean and os.path.exists(target):
+        logger.info("Removing existing directory: %s/", os.path.relpath(target))
         shutil.rmtree(target)
+    os.makedirs(target, exist_ok=True)
+    if plan is None:
+        plan = BuildPlan.scan(static_path=source)
+
+    wanted = set()
+    for rel_dir in plan.asset_dirs:
+        os.makedirs(os.path.join(target, rel_dir), exist_ok=True)
+    for asset in plan.assets:
+        rel_path = asset.rel_path
+        source_path = asset.path
+        if assets is not None:
+            rel_path = fingerprint_asset(asset, assets)
+        wanted.add(rel_path)
+        target_path = os.path.join(target, rel_path)
+        if asset_is_current(source_path, target_path, use_hash, asset):
+            stats.assets_unchanged += 1
+            continue
+        logger.debug("Copying file: %s -> %s", os.path.relpath(source_path), os.path.relpath(target_path))
+        copy_asset(source_path, target_path, link, asset.size)
+        stats.assets_copied += 1
+        stats.bytes_written += asset.size
+        stats.changed_outputs.append(target_path)
+
+    if assets is not None:
+        wanted.add(ASSET_MANIFEST_NAME)
+        if write_asset_manifest(target, assets):
+            stats.changed_outputs.append(os.path.join(target, ASSET_MANIFEST_NAME))
+
+    # Anything left in target that is neither a static asset nor a page the
+    # manifest vouches for (nor an enabled compression sidecar of one) is an
+    # orphan from an earlier build.
+    remove_orphans(target, wanted | set(keep), sidecars, stats)
+    return stats
+
+def remove_orphans(target, wanted, sidecars=(), stats=None):
+    for dir_path, dir_names, file_names in os.walk(target, topdown=False):
+        rel_dir = os.path.relpath(dir_path, target)
+        for name in file_names:
+            rel_path = os.path.normpath(os.path.join(rel_dir, name))
+            if rel_path in wanted:
+                continue
+            base, ext = os.path.splitext(rel_path)
+            if ext in sidecars and base in wanted:
+                continue
+            logger.debug("Removing orphan: %s", os.path.relpath(os.path.join(target, rel_path)))
+            os.remove(os.path.join(target, rel_path))
+            if stats is not None:
+                stats.assets_removed += 1
+        if dir_path != target and not os.listdir(dir_path):
+            os.rmdir(dir_path)
+
+class PageResult:
+    def __init__(self, from_path, dest_path):
+        self.from_path = from_path
+        self.dest_path = dest_path
+        self.built = False
+        self.changed = False
+        self.size = 0
+        self.entry = None
+        self.error = None
+        self.messages = []
+        self.profile = None
+        self.cache_counts = None
+        self.parse_cached = None
+        self.output = None
+
+
+def build_page_targets(results, previous, templates, force=False, cache=None):
+    # One source rendered into several outputs (one per basepath/output
+    # directory): the source is read and parsed once, and only targets
+    # whose output is stale are written.
+    markdown, source_hash = read_source(results[0].from_path)
+    stale = [i for i in range(len(results)) if needs_build(results[i], previous[i], templates[i], source_hash, force)]
+    if not stale:
+        return
+    document = load_document(results[stale[0]], markdown, source_hash, cache)
+    for i in stale:
+        try:
+            write_page(results[i], document, source_hash, templates[i])
+        except Exception as e:
+            results[i].error = f"{type(e).__name__}: {e}"
 
-    print(f"Creating fresh directory: {os.path.relpath(target)}/")
-    os.mkdir(target)
-
-    items = os.listdir(source)
-    for item in items:
-        source_path = os.path.join(source, item)
-        target_path = os.path.join(target, item)
-        is_file = os.path.isfile(os.path.join(source, item))
-        if is_file:
-            print(f"Copying file: {os.path.relpath(source_path)} -> {os.path.relpath(target_path)}")
-            shutil.copy(source_path, target)
+def read_source(from_path):
+    with profiler.stage("read"):
+        with open(from_path, "r") as f:
+            markdown = f.read()
+        source_hash = hash_bytes(markdown.encode())
+    return markdown, source_hash
+
+def needs_build(result, previous, template, source_hash, force=False):
+    from_path, dest_path = result.from_path, result.dest_path
+    with profiler.stage("check"):
+        fresh = not force and entry_is_fresh(previous, dest_path, source_hash, template.hash, template.basepath)
+    if fresh:
+        result.messages.append(f"Skipping unchanged page: {os.path.relpath(from_path)} -> {os.path.relpath(dest_path)}")
+        return False
+    result.messages.append(f"Generating page: {os.path.relpath(from_path)} -> {os.path.relpath(dest_path)} using {os.path.relpath(template.path)}")
+    return True
+
+def read_page(result, previous, template, force=False):
+    # Returns (markdown, source_hash), or None when the existing output is
+    # already up to date.
+    markdown, source_hash = read_source(result.from_path)
+    if not needs_build(result, previous, template, source_hash, force):
+        return None
+    return markdown, source_hash
+
+def load_document(result, markdown, source_hash, cache=None):
+    cached = None
+    if cache is not None:
+        with profiler.stage("cache"):
+            cached = cache.get(source_hash)
+        result.parse_cached = cached is not None
+    if cached is not None:
+        return Document.from_dict(cached)
+    document = parse_document(markdown)
+    if cache is not None:
+        with profiler.stage("cache"):
+            cache.put(source_hash, document.to_dict())
+    return document
+
+def write_page(result, document, source_hash, template):
+    dest_path = result.dest_path
+    tmp_path = dest_path + ".tmp"
+    # "serialize" streams into the file object's buffer; "write" covers
+    # creating the file, the final flush and swapping it into place.
+    with profiler.stage("write"):
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+        f = open(tmp_path, "w")
+    try:
+        with profiler.stage("serialize"):
+            writer = HashingWriter(f)
+            template.write_document(writer, document)
+    finally:
+        with profiler.stage("write"):
+            f.close()
+
+    with profiler.stage("write"):
+        result.changed = commit_output(tmp_path, dest_path, writer.hexdigest())
+    result.size = writer.size
+    result.built = True
+    result.entry = make_entry(result.from_path, source_hash, template.hash, template.basepath, writer.hexdigest(), document.info())
+
+def commit_output(tmp_path, dest_path, output_hash):
+    # Moves a freshly written output into place unless dest_path already
+    # holds the same bytes, so unchanged pages keep their mtime and are not
+    # re-uploaded by rsync or a CDN sync. Returns whether dest_path changed.
+    try:
+        if os.path.getsize(tmp_path) == os.path.getsize(dest_path) and hash_file(dest_path) == output_hash:
+            os.remove(tmp_path)
+            return False
+    except FileNotFoundError:
+        pass
+    os.replace(tmp_path, dest_path)
+    return True
+
+def render_page(job, template, force=False, cache=None):
+    from_path, dest_path, previous = job
+    return render_page_targets((from_path, [(dest_path, previous)]), [template], force, cache)[0]
+
+def render_page_targets(job, templates, force=False, cache=None):
+    from_path, targets = job
+    results = [PageResult(from_path, dest_path) for dest_path, _ in targets]
+    start = time.perf_counter_ns()
+    try:
+        build_page_targets(results, [previous for _, previous in targets], templates, force, cache)
+    except Exception as e:
+        for result in results:
+            if not result.built:
+                result.error = f"{type(e).__name__}: {e}"
+    end = time.perf_counter_ns()
+    # Kept in the manifest so the next parallel build can start the
+    # slowest pages first.
+    for result in results:
+        if result.entry is not None:
+            result.entry["render_ms"] = round((end - start) / 1e6, 3)
+    # Timings and cache counts cover the whole job; they ride on the first
+    # result so they are counted once.
+    result = results[0]
+    if profiler.enabled:
+        result.profile = {
+            "source": from_path,
+            "pid": os.getpid(),
+            "start": start,
+            "end": end,
+            "stages": profiler.take_totals(),
+        }
+    if block_cache.enabled:
+        result.cache_counts = block_cache.take_counts()
+    return results
+
+def render_page_batch(batch, templates, force=False, cache=None):
+    return [render_page_targets(job, templates, force, cache) for job in batch]
+
+def job_is_stale(job, templates, force=False):
+    # The check build_page_targets makes before rendering, without
+    # rendering or writing anything.
+    from_path, targets = job
+    if force:
+        return True
+    _, source_hash = read_source(from_path)
+    return any(not entry_is_fresh(previous, dest_path, source_hash, template.hash, template.basepath)
+               for (dest_path, previous), template in zip(targets, templates))
+
+def init_worker(profiling, block_cache_size):
+    profiler.set_enabled(profiling)
+    block_cache.set_maxsize(block_cache_size)
+
+def report_page(result, manifest=None, stats=None):
+    for message in result.messages:
+        logger.debug(message)
+    if stats is not None and result.cache_counts is not None:
+        stats.block_cache_hits += result.cache_counts[0]
+        stats.block_cache_misses += result.cache_counts[1]
+    if stats is not None and result.parse_cached is not None:
+        if result.parse_cached:
+            stats.parse_cache_hits += 1
         else:
-            print(f"Entering directory: {item}")
-            copy_source_to_target(source_path, target_path)
+            stats.parse_cache_misses += 1
+    if result.error is not None:
+        logger.error("Error generating page %s: %s", os.path.relpath(result.from_path), result.error)
+        if stats is not None:
+            stats.failed.append(result.from_path)
+            if result.profile is not None:
+                stats.page_profiles.append(result.profile)
+        return
+    if result.built and manifest is not None:
+        manifest.update(result.dest_path, result.entry)
+    if stats is not None and result.profile is not None:
+        stats.page_profiles.append(result.profile)
+    if stats is not None:
+        if result.built:
+            stats.built += 1
+            if result.changed:
+                stats.changed += 1
+                stats.changed_outputs.append(result.dest_path)
+                stats.bytes_written += result.size
+        else:
+            stats.skipped += 1
+
+def discover_pages(dir_path_content, dest_dir_path, manifest=None, stats=None, plan=None):
+    if stats is None:
+        stats = BuildStats()
+    work = []
+    with stats.phase("discover"):
+        if plan is None:
+            plan = BuildPlan.scan(dir_path_content)
+        for page in plan.pages:
+            dest_path = os.path.join(dest_dir_path, page.dest_rel_path)
+            previous = manifest.get(dest_path) if manifest is not None else None
+            work.append((page.path, dest_path, previous))
+    return work
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f"Generating page: {os.path.relpath(from_path)} -> {os.path.relpath(dest_path)} using {os.path.relpath(template_path)}")
+def discover_page_targets(dir_path_content, targets, stats=None, plan=None):
+    if stats is None:
+        stats = BuildStats()
+    work = []
+    with stats.phase("discover"):
+        if plan is None:
+            plan = BuildPlan.scan(dir_path_content)
+        for page in plan.pages:
+            page_targets = []
+            for _, dest_dir_path, manifest in targets:
+                dest_path = os.path.join(dest_dir_path, page.dest_rel_path)
+                previous = manifest.get(dest_path) if manifest is not None else None
+                page_targets.append((dest_path, previous))
+            work.append((page.path, page_targets))
+    return work
 
-    with open(from_path, "r") as f:
-        markdown = f.read()
+def report_page_targets(results, manifests, stats=None):
+    for result, manifest in zip(results, manifests):
+        report_page(result, manifest, stats)
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath, manifest=None, force=False, jobs=1, stats=None, cache=None, assets=None, plan=None):
+    return generate_pages_targets(dir_path_content, template_path, [(basepath, dest_dir_path, manifest)], force, jobs, stats, cache, assets, plan)
+
+def generate_pages_targets(dir_path_content, template_path, targets, force=False, jobs=1, stats=None, cache=None, assets=None, plan=None):
+    # targets is a list of (basepath, dest_dir_path, manifest); every page is
+    # parsed once and written to each target it is stale in.
+    if stats is None:
+        stats = BuildStats()
+    if plan is None:
+        with stats.phase("scan"):
+            plan = BuildPlan.scan(dir_path_content)
+    work = discover_page_targets(dir_path_content, targets, stats, plan)
 
     with open(template_path, "r") as f:
-        template = f.read()
-
-    html_node = markdown_to_html_node(markdown)
-    html_content = html_node.to_html()
-
-    title = extract_title(markdown)
-
-    page = template.replace("{{ Title }}", title).replace("{{ Content }}", html_content)
-    page = page.replace('href="/', f'href="{basepath}')
-    page = page.replace('src="/', f'src="{basepath}')
-
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir:
-        os.makedirs(dest_dir, exist_ok=True)
-
-    with open(dest_path, "w") as f:
-        f.write(page)
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    print(f"Scanning directory: {os.path.relpath(dir_path_content)}")
-    items = os.listdir(dir_path_content)
-    for item in items:
-        source_path = os.path.join(dir_path_content, item)
-        is_file = os.path.isfile(source_path)
-        if is_file:
-            if item.endswith(".md"):
-                dest_file = item.replace(".md", ".html")
-                dest_path = os.path.join(dest_dir_path, dest_file)
-                print(f"  Generating: {os.path.relpath(source_path)} -> {os.path.relpath(dest_path)}")
-                generate_page(source_path, template_path, dest_path, basepath)
-            else:
-                print(f"  Skipping non-markdown file: {item}")
-        else:
-            new_dest_path = os.path.join(dest_dir_path, item)
-            generate_pages_recursive(source_path, template_path, new_dest_path, basepath)
+        source = f.read()
+    templates = [Template(source, basepath, template_path, assets) for basepath, _, _ in targets]
+    manifests = [manifest for _, _, manifest in targets]
+    render = partial(render_page_targets, templates=templates, force=force, cache=cache)
+    progress = Progress(len(work), "Pages")
+    with stats.phase("pages"):
+        if jobs <= 1 or len(work) <= 1:
+            for job in work:
+                report_page_targets(render(job), manifests, stats)
+                progress.advance()
+            return stats
+
+        # Longest first, by last build's render time or else source size, so
+        # no worker is left with a giant page after the others are done.
+        costs = [cost for cost, _ in estimate_costs(work, {page.path: page.size for page in plan.pages})]
+        batches = batch_jobs(longest_first(costs), costs, jobs)
+        render_batch = partial(render_page_batch, templates=templates, force=force, cache=cache)
+        # Results are reported in discovery order, as in a serial build, so
+        # logs and manifest updates don't depend on scheduling.
+        finished = {}
+        next_index = 0
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(profiler.enabled, block_cache.maxsize)) as executor:
+            for batch, batch_results in zip(batches, executor.map(render_batch, [[work[i] for i in batch] for batch in batches])):
+                finished.update(zip(batch, batch_results))
+                while next_index in finished:
+                    report_page_targets(finished.pop(next_index), manifests, stats)
+                    progress.advance()
+                    next_index += 1
+    return stats
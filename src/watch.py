@@ -0,0 +1,167 @@
+import os
+import time
+
+from compress import remove_sidecars
+from log import logger
+from server import ReloadNotifier, start_server
+from stats import BuildStats
+from template import Template
+from utils import copy_asset, generate_pages_recursive, render_page, report_page, sync_source_to_target
+
+
+def snapshot(root):
+    # Editors create and delete temporary files while saving, so anything
+    # may vanish between listing and stat; it is left out of this snapshot
+    # and a later poll sees the settled tree.
+    entries = {}
+    if os.path.isfile(root):
+        try:
+            st = os.stat(root)
+        except FileNotFoundError:
+            return entries
+        entries[root] = (st.st_mtime_ns, st.st_size)
+        return entries
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        st = entry.stat()
+                        entries[entry.path] = (st.st_mtime_ns, st.st_size)
+                except FileNotFoundError:
+                    continue
+    return entries
+
+
+def diff_snapshots(old, new):
+    changed = sorted(path for path, signature in new.items() if old.get(path) != signature)
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+
+def page_dest_path(source_path, content_path, docs_path):
+    rel_dir, name = os.path.split(os.path.relpath(source_path, content_path))
+    return os.path.join(docs_path, rel_dir, name.replace(".md", ".html"))
+
+
+class Watcher:
+    def __init__(self, content_path, static_path, template_path, docs_path, basepath, manifest, jobs=1, cache=None, compressor=None, assets=None):
+        self.content_path = content_path
+        self.static_path = static_path
+        self.template_path = template_path
+        self.docs_path = docs_path
+        self.basepath = basepath
+        self.manifest = manifest
+        self.jobs = jobs
+        self.cache = cache
+        self.compressor = compressor
+        self.assets = assets
+        self.template = Template.load(template_path, basepath, assets)
+        self.snapshots = {
+            content_path: snapshot(content_path),
+            static_path: snapshot(static_path),
+            template_path: snapshot(template_path),
+        }
+
+    def poll(self):
+        changes = {}
+        for root, old in self.snapshots.items():
+            new = snapshot(root)
+            changed, removed = diff_snapshots(old, new)
+            if changed or removed:
+                changes[root] = (changed, removed)
+                self.snapshots[root] = new
+        return changes
+
+    def rebuild(self, changes):
+        stats = BuildStats()
+        rebuild_all = self.template_path in changes
+        if rebuild_all:
+            logger.info("Template changed, rebuilding all pages")
+        if self.assets is not None and self.static_path in changes:
+            # Fingerprinted names depend on content, so resync the whole
+            # tree and re-render every page if any URL moved.
+            assets = {}
+            sidecars = self.compressor.extensions if self.compressor is not None else ()
+            sync_source_to_target(self.static_path, self.docs_path, self.manifest.outputs(), stats=stats, sidecars=sidecars, assets=assets)
+            if assets != self.assets:
+                self.assets = assets
+                if not rebuild_all:
+                    logger.info("Asset fingerprints changed, rebuilding all pages")
+                rebuild_all = True
+        if rebuild_all:
+            self.template = Template.load(self.template_path, self.basepath, self.assets)
+            # seen still holds every page of earlier builds; start afresh so
+            # prune drops pages removed in this poll.
+            self.manifest.seen.clear()
+            generate_pages_recursive(self.content_path, self.template_path, self.docs_path, self.basepath, self.manifest, jobs=self.jobs, stats=stats, cache=self.cache, assets=self.assets)
+            stats.removed = len(self.manifest.prune())
+        elif self.content_path in changes:
+            changed, removed = changes[self.content_path]
+            for from_path in changed:
+                if from_path.endswith(".md"):
+                    dest_path = page_dest_path(from_path, self.content_path, self.docs_path)
+                    job = (from_path, dest_path, self.manifest.get(dest_path))
+                    report_page(render_page(job, self.template, cache=self.cache), self.manifest, stats)
+            for from_path in removed:
+                if from_path.endswith(".md"):
+                    logger.debug("Removing page: %s", os.path.relpath(from_path))
+                    self.manifest.remove(page_dest_path(from_path, self.content_path, self.docs_path))
+                    stats.removed += 1
+
+        if self.static_path in changes and self.assets is None:
+            changed, removed = changes[self.static_path]
+            for source_path in changed:
+                target_path = os.path.join(self.docs_path, os.path.relpath(source_path, self.static_path))
+                logger.debug("Copying file: %s -> %s", os.path.relpath(source_path), os.path.relpath(target_path))
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                copy_asset(source_path, target_path)
+                stats.assets_copied += 1
+                stats.bytes_written += os.path.getsize(target_path)
+                stats.changed_outputs.append(target_path)
+            for source_path in removed:
+                target_path = os.path.join(self.docs_path, os.path.relpath(source_path, self.static_path))
+                if os.path.isfile(target_path):
+                    logger.debug("Removing orphan: %s", os.path.relpath(target_path))
+                    os.remove(target_path)
+                    remove_sidecars(target_path)
+                    stats.assets_removed += 1
+
+        if self.compressor is not None:
+            stats.compressed = self.compressor.run(self.docs_path, stats.changed_outputs)
+        self.manifest.save()
+        return stats
+
+
+def watch(content_path, static_path, template_path, docs_path, basepath, manifest, port=8888, interval=0.05, jobs=1, cache=None, compressor=None, assets=None):
+    watcher = Watcher(content_path, static_path, template_path, docs_path, basepath, manifest, jobs, cache, compressor, assets)
+    notifier = ReloadNotifier()
+    server = start_server(docs_path, port, notifier)
+    logger.info("Serving %s/ at http://localhost:%d/ (watching for changes, Ctrl-C to stop)", os.path.relpath(docs_path), port)
+    try:
+        while True:
+            time.sleep(interval)
+            try:
+                changes = watcher.poll()
+                if not changes:
+                    continue
+                start = time.perf_counter()
+                stats = watcher.rebuild(changes)
+            except Exception as e:
+                # Keep serving; the next save triggers another rebuild.
+                logger.error("Rebuild failed: %s: %s", type(e).__name__, e)
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            logger.info("Rebuilt in %.1f ms: %s", elapsed, stats.summary())
+            notifier.notify()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
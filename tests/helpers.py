@@ -0,0 +1,31 @@
+import logging
+import os
+
+from log import logger
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def read_tree(root):
+    # Every output under root by relative path, without the build's own
+    # .ssg-* bookkeeping files.
+    files = {}
+    for dir_path, _, file_names in os.walk(root):
+        for name in file_names:
+            if not name.startswith(".ssg-"):
+                with open(os.path.join(dir_path, name), "rb") as f:
+                    files[os.path.relpath(os.path.join(dir_path, name), root)] = f.read()
+    return files
+
+
+def reset_logging():
+    # main() and configure_logging() point the logger at the stdout of the
+    # time; put it back so later tests can use assertLogs.
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+    logger.propagate = True
@@ -1,5 +1,5 @@
 import unittest
-from block_markdown import BlockType, markdown_to_blocks, block_to_block_type
+from block_markdown import BlockType, markdown_to_blocks, block_to_block_type, scan_blocks
 
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -145,5 +145,46 @@ class TestBlockToBlockType(unittest.TestCase):
     def test_paragraph_multiline(self):
         self.assertEqual(block_to_block_type("line one\nline two"), BlockType.PARAGRAPH)
 
+class TestScanBlocks(unittest.TestCase):
+    def test_classifies_while_scanning(self):
+        md = "# Title\n\nSome text\nmore text\n\n> quote\n> more\n\n- a\n- b\n\n1. one\n2. two"
+        self.assertEqual(list(scan_blocks(md)), [
+            (BlockType.HEADING, ["# Title"]),
+            (BlockType.PARAGRAPH, ["Some text", "more text"]),
+            (BlockType.QUOTE, ["> quote", "> more"]),
+            (BlockType.UNORDERED_LIST, ["- a", "- b"]),
+            (BlockType.ORDERED_LIST, ["1. one", "2. two"]),
+        ])
+
+    def test_is_lazy(self):
+        blocks = scan_blocks("one\n\ntwo")
+        self.assertEqual(next(blocks), (BlockType.PARAGRAPH, ["one"]))
+
+    def test_fenced_code_keeps_blank_lines(self):
+        md = "before\n\n```\nline one\n\nline two\n```\n\nafter"
+        self.assertEqual(list(scan_blocks(md)), [
+            (BlockType.PARAGRAPH, ["before"]),
+            (BlockType.CODE, ["```", "line one", "", "line two", "```"]),
+            (BlockType.PARAGRAPH, ["after"]),
+        ])
+
+    def test_unclosed_fence_is_ordinary_block(self):
+        md = "```\nnot closed\n\nnext"
+        self.assertEqual(list(scan_blocks(md)), [
+            (BlockType.PARAGRAPH, ["```", "not closed"]),
+            (BlockType.PARAGRAPH, ["next"]),
+        ])
+
+    def test_whitespace_only_line_separates_blocks(self):
+        self.assertEqual(markdown_to_blocks("one\n   \ntwo"), ["one", "two"])
+
+    def test_matches_block_to_block_type(self):
+        md = "## h\n\n# \n\n>q\n\n- a\n-b\n\n1. a\n3. b\n\n```x```\n\n  indented  "
+        self.assertEqual(
+            [(block_type, "\n".join(lines)) for block_type, lines in scan_blocks(md)],
+            [(block_to_block_type(block), block) for block in markdown_to_blocks(md)],
+        )
+
+
 if __name__ == 'main':
     unittest.main()
\ No newline at end of file
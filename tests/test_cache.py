@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import ParseCache
+from template import Template
+from utils import render_page
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, ".ssg-cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        cache = ParseCache(self.root)
+        self.assertIsNone(cache.get("ab" * 32))
+        cache.put("ab" * 32, {"title": "Title", "html": "<div><p>x</p></div>"})
+        self.assertEqual(cache.get("ab" * 32), {"title": "Title", "html": "<div><p>x</p></div>"})
+
+    def test_evicts_other_parser_versions(self):
+        stale = os.path.join(self.root, "v0", "ab", "old.json")
+        os.makedirs(os.path.dirname(stale))
+        with open(stale, "w") as f:
+            f.write("{}")
+        cache = ParseCache(self.root)
+        cache.put("cd" * 32, {"html": "<div></div>"})
+        self.assertEqual(cache.evict(), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "v0")))
+        self.assertIsNotNone(cache.get("cd" * 32))
+
+    def test_keeps_entries_under_dot_relative_root(self):
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            cache = ParseCache(os.path.join(".", ".ssg-cache"))
+            cache.put("ab" * 32, {"html": "<div></div>"})
+            self.assertEqual(cache.evict(), 0)
+            self.assertIsNotNone(cache.get("ab" * 32))
+        finally:
+            os.chdir(cwd)
+
+    def test_evicts_least_recently_used_over_limit(self):
+        cache = ParseCache(self.root)
+        for i, key in enumerate(["aa", "bb", "cc"]):
+            cache.put(key * 32, {"html": "x" * 100})
+            os.utime(cache.path(key * 32), ns=(i * 10**9, i * 10**9))
+        cache.get("aa" * 32)
+        cache.max_bytes = 2 * os.path.getsize(cache.path("aa" * 32))
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNone(cache.get("bb" * 32))
+        self.assertIsNotNone(cache.get("aa" * 32))
+        self.assertIsNotNone(cache.get("cc" * 32))
+
+    def test_concurrent_evictions(self):
+        # Parallel --shard builds share the cache and evict at the same
+        # time; none of them may fail on files another one removed.
+        for version in (0, 1):
+            for i in range(200):
+                path = os.path.join(self.root, f"v{version}", f"{i:02x}", "old.json")
+                os.makedirs(os.path.dirname(path))
+                with open(path, "w") as f:
+                    f.write("{}")
+        cache = ParseCache(self.root, max_bytes=0)
+        for i in range(200):
+            cache.put(f"{i:064x}", {"html": "x"})
+        with ThreadPoolExecutor(4) as pool:
+            removed = list(pool.map(lambda cache: cache.evict(), [ParseCache(self.root, max_bytes=0) for _ in range(4)]))
+        self.assertEqual(sum(removed), 600)
+        self.assertEqual(os.listdir(self.root), [])
+
+
+class TestRenderPageWithCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "index.md")
+        self.dest = os.path.join(self.tmp.name, "index.html")
+        with open(self.source, "w") as f:
+            f.write("# Hello\n\nA [link](/about)")
+        self.cache = ParseCache(os.path.join(self.tmp.name, ".ssg-cache"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, template):
+        result = render_page((self.source, self.dest, None), template, cache=self.cache)
+        self.assertIsNone(result.error)
+        with open(self.dest) as f:
+            return result, f.read()
+
+    def test_template_change_reuses_parsed_page(self):
+        first, _ = self.render(Template("<h1>{{ Title }}</h1>{{ Content }}", path="template.html"))
+        self.assertFalse(first.parse_cached)
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>", "/blog/", "template.html")
+        second, html = self.render(template)
+        self.assertTrue(second.parse_cached)
+        self.assertEqual(html, '<title>Hello</title><main><div><h1>Hello</h1><p>A <a href="/blog/about">link</a></p></div></main>')
+        self.assertEqual(second.entry["output_hash"], render_page((self.source, self.dest, None), template).entry["output_hash"])
+
+
+if __name__ == "__main__":
+    unittest.main()
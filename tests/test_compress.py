@@ -0,0 +1,71 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import Compressor, remove_sidecars
+from helpers import write
+from utils import sync_source_to_target
+
+
+class TestCompressor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.page = os.path.join(self.root, "blog", "index.html")
+        write(self.page, "<p>hello</p>" * 200)
+        write(os.path.join(self.root, "small.css"), "body {}")
+        write(os.path.join(self.root, "image.png"), "x" * 5000)
+        write(os.path.join(self.root, ".ssg-manifest.json"), "{}" * 1000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compresses_large_text_outputs_once(self):
+        compressor = Compressor(min_size=100)
+        self.assertEqual(compressor.run(self.root), 1)
+        with gzip.open(self.page + ".gz", "rb") as f:
+            self.assertEqual(f.read(), b"<p>hello</p>" * 200)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "small.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "image.png.gz")))
+        self.assertEqual(compressor.run(self.root), 0)
+
+    def test_recompresses_changed_outputs(self):
+        compressor = Compressor(min_size=100, jobs=2)
+        compressor.run(self.root)
+        write(self.page, "<p>changed</p>" * 200)
+        self.assertEqual(compressor.run(self.root, [self.page]), 1)
+        with gzip.open(self.page + ".gz", "rb") as f:
+            self.assertEqual(f.read(), b"<p>changed</p>" * 200)
+
+    def test_output_shrunk_below_threshold_drops_sidecar(self):
+        compressor = Compressor(min_size=100)
+        compressor.run(self.root)
+        write(self.page, "<p>hi</p>")
+        compressor.run(self.root, [self.page])
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            Compressor(["br"])
+
+    def test_remove_sidecars(self):
+        Compressor(min_size=100).run(self.root)
+        self.assertEqual(remove_sidecars(self.page), 1)
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+
+
+class TestSidecarsSurviveSync(unittest.TestCase):
+    def test_only_enabled_sidecars_of_known_outputs_are_kept(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static = os.path.join(tmp, "static")
+            docs = os.path.join(tmp, "docs")
+            write(os.path.join(static, "index.css"), "body {}")
+            for name in ("index.css.gz", "index.html.gz", "gone.html.gz", "index.css.zst"):
+                write(os.path.join(docs, name), "x")
+            sync_source_to_target(static, docs, keep={"index.html"}, sidecars=(".gz",))
+            self.assertEqual(sorted(os.listdir(docs)), ["index.css", "index.css.gz", "index.html.gz"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import itertools
+import random
 import unittest
 from textnode import TextNode, TextType
 from inline_markdown import split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes
@@ -311,6 +313,13 @@ class TestSplitNodesLink(unittest.TestCase):
             TextNode(" and ![img](https://img.com)", TextType.TEXT),
         ])
 
+    def test_link_text_repeated_inside_image(self):
+        node = TextNode("![a](/u) and [a](/u)", TextType.TEXT)
+        self.assertEqual(split_nodes_link([node]), [
+            TextNode("![a](/u) and ", TextType.TEXT),
+            TextNode("a", TextType.ANCHOR, "/u"),
+        ])
+
 class TestTextToTextNodes(unittest.TestCase):
     def test_plain_text(self):
         nodes = text_to_textnodes("plain text")
@@ -411,5 +420,62 @@ class TestTextToTextNodes(unittest.TestCase):
         self.assertEqual(nodes, [])
 
 
+def multipass_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    return nodes
+
+def parse_or_error(parse, text):
+    try:
+        return parse(text)
+    except Exception:
+        return "error"
+
+class TestTextToTextNodesMatchesMultipass(unittest.TestCase):
+    def test_random_inputs(self):
+        rng = random.Random(0)
+        for _ in range(3000):
+            counter = itertools.count()
+            atoms = [
+                lambda: "a", lambda: "b ", lambda: "**", lambda: "_", lambda: "`",
+                lambda: "[", lambda: "]", lambda: "(", lambda: ")", lambda: "!", lambda: "*",
+                lambda: f"[x{next(counter)}](/u)", lambda: f"![i{next(counter)}](/p)",
+            ]
+            text = "".join(rng.choice(atoms)() for _ in range(rng.randint(0, 12)))
+            self.assertEqual(
+                parse_or_error(text_to_textnodes, text),
+                parse_or_error(multipass_text_to_textnodes, text),
+                text,
+            )
+
+
+class TestInlineLargeInputs(unittest.TestCase):
+    # Node counts on long runs of repeated markup. Timing is left to
+    # benchmarks/bench_adversarial.py; here every unit must still be
+    # matched on its own, however many precede it.
+    N = 4000
+
+    def test_node_counts(self):
+        cases = [
+            ("[link](/page) ", text_to_textnodes, 2 * self.N),
+            ("![alt](/image.png) ", text_to_textnodes, 2 * self.N),
+            ("x ![i](/i.png) [l](/u) **b** _i_ `c` ", text_to_textnodes, 10 * self.N + 1),
+            ("[link](/page) ", lambda text: split_nodes_link([TextNode(text, TextType.TEXT)]), 2 * self.N),
+            ("![alt](/image.png) ", lambda text: split_nodes_image([TextNode(text, TextType.TEXT)]), 2 * self.N),
+            ("[", text_to_textnodes, 1),
+            ("**", lambda text: split_nodes_link([TextNode(text, TextType.TEXT)]), 1),
+        ]
+        for unit, parse, expected in cases:
+            self.assertEqual(len(parse(unit * self.N)), expected, repr(unit))
+
+    def test_unclosed_brackets_stay_text(self):
+        text = "[" * self.N + "](" * self.N
+        self.assertEqual(text_to_textnodes(text), [TextNode(text, TextType.TEXT)])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
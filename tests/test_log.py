@@ -0,0 +1,91 @@
+import io
+import logging
+import unittest
+
+from helpers import reset_logging
+from log import NORMAL, QUIET, VERBOSE, BufferedHandler, Progress, configure_logging, logger
+from stats import BuildStats, format_size
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestBufferedHandler(unittest.TestCase):
+    def setUp(self):
+        self.stream = CountingStream()
+        self.handler = BufferedHandler(self.stream, interval=3600)
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def record(self, level, message):
+        return logging.LogRecord("ssg", level, __file__, 0, message, None, None)
+
+    def test_batches_debug_lines(self):
+        for i in range(100):
+            self.handler.emit(self.record(logging.DEBUG, f"page {i}"))
+        self.assertEqual(self.stream.writes, 0)
+        self.handler.emit(self.record(logging.INFO, "done"))
+        self.assertEqual(self.stream.writes, 1)
+        self.assertEqual(self.stream.getvalue().splitlines(), [f"page {i}" for i in range(100)] + ["done"])
+
+    def test_flush_writes_pending_lines(self):
+        self.handler.emit(self.record(logging.DEBUG, "page"))
+        self.handler.flush()
+        self.assertEqual(self.stream.getvalue(), "page\n")
+
+
+class TestConfigureLogging(unittest.TestCase):
+    def tearDown(self):
+        reset_logging()
+
+    def output(self, level):
+        stream = io.StringIO()
+        configure_logging(level, stream)
+        logger.debug("Copying file")
+        logger.info("Built 1 pages")
+        logger.error("Error generating page")
+        return stream.getvalue().splitlines()
+
+    def test_levels(self):
+        self.assertEqual(self.output(QUIET), ["Error generating page"])
+        self.assertEqual(self.output(NORMAL), ["Built 1 pages", "Error generating page"])
+        self.assertEqual(self.output(VERBOSE), ["Copying file", "Built 1 pages", "Error generating page"])
+
+
+class TestProgress(unittest.TestCase):
+    def test_reports_at_interval_and_end(self):
+        progress = Progress(3, "Pages", interval=3600)
+        with self.assertLogs("ssg", "INFO") as logs:
+            for _ in range(3):
+                progress.advance()
+        self.assertEqual(logs.output, ["INFO:ssg:Pages: 3/3"])
+
+        progress = Progress(3, "Pages", interval=0)
+        with self.assertLogs("ssg", "INFO") as logs:
+            for _ in range(3):
+                progress.advance()
+        self.assertEqual(len(logs.output), 3)
+
+
+class TestSummary(unittest.TestCase):
+    def test_bytes_and_phases(self):
+        stats = BuildStats()
+        stats.bytes_written = 3 * 1024 * 1024
+        stats.phases = [("assets", 0, 2_000_000), ("pages", 2_000_000, 10_000_000), ("pages", 10_000_000, 11_000_000)]
+        summary = stats.summary().splitlines()
+        self.assertIn("Wrote 3.0 MB", summary)
+        self.assertIn("Phases: assets 2.0 ms, pages 9.0 ms (total 11.0 ms)", summary)
+
+    def test_format_size(self):
+        self.assertEqual(format_size(512), "512 B")
+        self.assertEqual(format_size(1536), "1.5 KB")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest, entry_is_fresh, hash_bytes, make_entry
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.dest = os.path.join(self.root, "index.html")
+        with open(self.dest, "w") as f:
+            f.write("<p>hi</p>")
+        self.output_hash = hash_bytes(b"<p>hi</p>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def record(self, manifest):
+        manifest.update(self.dest, make_entry("index.md", "src", "tpl", "/", self.output_hash))
+
+    def is_fresh(self, manifest, source_hash="src", template_hash="tpl", basepath="/"):
+        return entry_is_fresh(manifest.get(self.dest), self.dest, source_hash, template_hash, basepath)
+
+    def test_missing_manifest_is_empty(self):
+        manifest = BuildManifest.load(self.root)
+        self.assertEqual(manifest.pages, {})
+        self.assertFalse(self.is_fresh(manifest))
+
+    def test_round_trip_is_fresh(self):
+        manifest = BuildManifest(self.root)
+        self.record(manifest)
+        manifest.save()
+        loaded = BuildManifest.load(self.root)
+        self.assertTrue(self.is_fresh(loaded))
+
+    def test_changed_inputs_are_stale(self):
+        manifest = BuildManifest(self.root)
+        self.record(manifest)
+        self.assertFalse(self.is_fresh(manifest, source_hash="src2"))
+        self.assertFalse(self.is_fresh(manifest, template_hash="tpl2"))
+        self.assertFalse(self.is_fresh(manifest, basepath="/blog/"))
+
+    def test_modified_output_is_stale(self):
+        manifest = BuildManifest(self.root)
+        self.record(manifest)
+        with open(self.dest, "w") as f:
+            f.write("<p>edited</p>")
+        self.assertFalse(self.is_fresh(manifest))
+
+    def test_prune_removes_unseen_pages(self):
+        manifest = BuildManifest(self.root)
+        self.record(manifest)
+        manifest.save()
+        loaded = BuildManifest.load(self.root)
+        self.assertEqual(loaded.prune(), ["index.html"])
+        self.assertEqual(loaded.pages, {})
+        self.assertFalse(os.path.exists(self.dest))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,17 @@
+import glob
+import os
+import random
 import unittest
 
 from htmlnode import LeafNode, ParentNode
 from markdown import (
+    URL_MARK,
+    Document,
+    parse_document,
+    split_front_matter,
+    BlockCache,
+    block_cache,
+    markdown_to_html,
     markdown_to_html_node,
     text_to_children,
     paragraph_to_html_node,
@@ -97,6 +107,12 @@ code
             ParentNode("ol", [ParentNode("li", [LeafNode(None, "ordered")])]),
         ]))
 
+    def test_fenced_code_with_blank_line(self):
+        node = markdown_to_html_node("```\nfirst\n\nsecond\n```")
+        self.assertEqual(node, ParentNode("div", [
+            ParentNode("pre", [ParentNode("code", [LeafNode(None, "\nfirst\n\nsecond\n")])]),
+        ]))
+
 class TestTextToChildren(unittest.TestCase):
     def test_plain_text(self):
         children = text_to_children("plain text")
@@ -338,5 +354,137 @@ class TestExtractTitle(unittest.TestCase):
         with self.assertRaises(ValueError):
             extract_title("")
 
+def render_or_error(render, markdown):
+    try:
+        return render(markdown)
+    except Exception:
+        return "error"
+
+class TestMarkdownToHtmlMatchesTree(unittest.TestCase):
+    def assertMatchesTree(self, markdown):
+        self.assertEqual(
+            render_or_error(markdown_to_html, markdown),
+            render_or_error(lambda md: markdown_to_html_node(md).to_html(), markdown),
+            markdown,
+        )
+
+    def test_site_content(self):
+        content = os.path.join(os.path.dirname(__file__), "..", "content")
+        paths = glob.glob(os.path.join(content, "**", "*.md"), recursive=True)
+        self.assertTrue(paths)
+        for path in paths:
+            with open(path, "r") as f:
+                self.assertMatchesTree(f.read())
+
+    def test_random_documents(self):
+        lines = [
+            "text", "# h", "## h **b**", "####### h", "> q", ">q _i_", "- u `c`", "-x", "1. o", "2. o",
+            "10. x", "```", "```x```", "trailing  ", "", " indented", "[l](/u) ![i](/p)", "**", "#nope",
+        ]
+        rng = random.Random(0)
+        for _ in range(2000):
+            self.assertMatchesTree("\n".join(rng.choice(lines) for _ in range(rng.randint(0, 12))))
+
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\ntext"), ({}, "# Title\n\ntext"))
+
+    def test_parses_values(self):
+        markdown = "---\ntitle: \"Hello: world\"\ndate: 2024-01-02\ntags: [a, b]\ndraft: true\norder: 3\n# comment\n---\n# Body"
+        metadata, body = split_front_matter(markdown)
+        self.assertEqual(metadata, {"title": "Hello: world", "date": "2024-01-02", "tags": ["a", "b"], "draft": True, "order": 3})
+        self.assertEqual(body, "# Body")
+
+    def test_unclosed_front_matter_is_markdown(self):
+        self.assertEqual(split_front_matter("---\ntitle: x\n# Body"), ({}, "---\ntitle: x\n# Body"))
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\nnot a pair\n---\n")
+
+
+class TestParseDocument(unittest.TestCase):
+    def test_collects_metadata_in_one_pass(self):
+        markdown = "---\nslug: hi\n---\n# Hello **there**\n\nSee [the docs](/docs) and ![a cat](/cat.png)\n\n- one two\n- [three](https://x.y)\n\n```\nprint(1)\n```"
+        document = parse_document(markdown)
+        self.assertEqual(document.title, "Hello **there**")
+        self.assertEqual(document.metadata, {"slug": "hi"})
+        self.assertEqual(document.links, ["/docs", "https://x.y"])
+        self.assertEqual(document.images, ["/cat.png"])
+        self.assertEqual(document.word_count, 2 + 4 + 3 + 1)
+        self.assertEqual(document.to_html(), markdown_to_html(split_front_matter(markdown)[1]))
+
+    def test_title_from_front_matter(self):
+        self.assertEqual(parse_document("---\ntitle: Notes\n---\ntext").title, "Notes")
+
+    def test_title_errors(self):
+        with self.assertRaises(ValueError):
+            parse_document("just text")
+        with self.assertRaises(ValueError):
+            parse_document("# One\n\n# Two")
+
+    def test_body_resolves_marked_urls(self):
+        html = f"{URL_MARK}/a{URL_MARK}<p>{URL_MARK}/b{URL_MARK}{URL_MARK}/c{URL_MARK}</p>"
+        document = Document("T", {}, html)
+        self.assertEqual(document.to_html(), "/a<p>/b/c</p>")
+        self.assertEqual(document.to_html(lambda url: "/base" + url), "/base/a<p>/base/b/base/c</p>")
+        self.assertEqual(list(Document("T", {}, "<p>x</p>").body()), ["<p>x</p>"])
+
+    def test_matches_extract_title_and_html_for_site_content(self):
+        content = os.path.join(os.path.dirname(__file__), "..", "content")
+        for path in glob.glob(os.path.join(content, "**", "*.md"), recursive=True):
+            with open(path, "r") as f:
+                markdown = f.read()
+            document = parse_document(markdown)
+            self.assertEqual(document.title, extract_title(markdown))
+            self.assertEqual(document.to_html(), markdown_to_html(markdown))
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        block_cache.set_maxsize(64)
+        block_cache.clear()
+
+    def tearDown(self):
+        block_cache.set_maxsize(0)
+        block_cache.clear()
+
+    def test_cached_render_matches_fresh(self):
+        markdown = "# Title\n\nShared **disclaimer** with [a link](/x).\n\n- one\n- two\n\n```\ncode\n```"
+        block_cache.set_maxsize(0)
+        fresh_html = markdown_to_html(markdown)
+        fresh_tree = markdown_to_html_node(markdown).to_html()
+        block_cache.set_maxsize(64)
+        for _ in range(2):
+            self.assertEqual(markdown_to_html(markdown), fresh_html)
+            self.assertEqual(markdown_to_html_node(markdown).to_html(), fresh_tree)
+
+    def test_counts_hits_across_documents(self):
+        markdown_to_html("Shared paragraph\n\n# One")
+        markdown_to_html("Shared paragraph\n\n# Two")
+        self.assertEqual(block_cache.take_counts(), (1, 3))
+        self.assertEqual(block_cache.take_counts(), (0, 0))
+
+    def test_renderers_do_not_share_entries(self):
+        markdown_to_html("Shared paragraph")
+        node = markdown_to_html_node("Shared paragraph")
+        self.assertIsInstance(node.children[0], ParentNode)
+        self.assertEqual(block_cache.take_counts(), (0, 2))
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(2)
+        render = lambda block_type, lines: "\n".join(lines)
+        cache.render(render, None, ["a"])
+        cache.render(render, None, ["b"])
+        cache.render(render, None, ["a"])
+        cache.render(render, None, ["c"])
+        self.assertEqual([key[2] for key in cache.entries], ["a", "c"])
+        self.assertEqual(cache.take_counts(), (1, 3))
+
+    def test_disabled_by_default(self):
+        self.assertFalse(BlockCache().enabled)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from helpers import read_tree, write
+from manifest import BuildManifest
+from pipeline import generate_pages_async
+from utils import generate_pages_recursive
+
+TEMPLATE = "<title>{{ Title }}</title><a href=\"/\">home</a>{{ Content }}"
+
+
+class TestGeneratePagesAsync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write(self.template, TEMPLATE)
+        for i in range(12):
+            write(os.path.join(self.content, f"section{i % 3}", f"page{i}.md"), f"# Page {i}\n\nSee [home](/) and **bold** {i}.")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, generate, dest, **kwargs):
+        manifest = BuildManifest(dest)
+        with self.assertLogs("ssg", "DEBUG") as logs:
+            stats = generate(self.content, self.template, dest, "/blog/", manifest, **kwargs)
+        return stats, manifest, "\n".join(logs.output)
+
+    def test_matches_serial_build(self):
+        serial_dest = os.path.join(self.tmp.name, "serial")
+        async_dest = os.path.join(self.tmp.name, "async")
+        _, serial_manifest, serial_log = self.build(generate_pages_recursive, serial_dest)
+        stats, async_manifest, async_log = self.build(generate_pages_async, async_dest, depth=2)
+        self.assertEqual(stats.built, 12)
+        self.assertEqual(read_tree(async_dest), read_tree(serial_dest))
+        self.assertEqual(async_log.replace("async", "serial"), serial_log)
+        self.assertEqual(
+            {key: entry["output_hash"] for key, entry in async_manifest.pages.items()},
+            {key: entry["output_hash"] for key, entry in serial_manifest.pages.items()},
+        )
+
+    def test_skips_fresh_and_reports_errors(self):
+        dest = os.path.join(self.tmp.name, "docs")
+        _, manifest, _ = self.build(generate_pages_async, dest)
+        manifest.save()
+        write(os.path.join(self.content, "section0", "page0.md"), "no title")
+        manifest = BuildManifest.load(dest)
+        with self.assertLogs("ssg", "ERROR") as logs:
+            stats = generate_pages_async(self.content, self.template, dest, "/blog/", manifest, depth=4)
+        self.assertIn("No title", logs.output[0])
+        self.assertEqual(stats.skipped, 11)
+        self.assertEqual(stats.failed, [os.path.join(self.content, "section0", "page0.md")])
+
+
+if __name__ == '__main__':
+    unittest.main()
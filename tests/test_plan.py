@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from helpers import write
+from plan import BuildPlan
+from utils import generate_pages_recursive, sync_source_to_target
+
+
+class TestBuildPlan(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        write(os.path.join(self.content, "index.md"), "# Home")
+        write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nBody")
+        write(os.path.join(self.content, "blog", "notes.txt"), "not a page")
+        write(os.path.join(self.content, "about.md"), "# About")
+        write(os.path.join(self.static, "images", "logo.png"), "png")
+        write(os.path.join(self.static, "index.css"), "body {}")
+        os.makedirs(os.path.join(self.static, "empty"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def scan(self):
+        return BuildPlan.scan(self.content, self.static)
+
+    def test_pages_and_dest_paths(self):
+        plan = self.scan()
+        self.assertEqual([page.rel_path for page in plan.pages], ["about.md", os.path.join("blog", "post.md"), "index.md"])
+        self.assertEqual([page.dest_rel_path for page in plan.pages], ["about.html", os.path.join("blog", "post.html"), "index.html"])
+        self.assertEqual(plan.pages[1].path, os.path.join(self.content, "blog", "post.md"))
+        self.assertEqual(plan.pages[1].size, len("# Post\n\nBody"))
+
+    def test_assets_listed_before_subdirectories(self):
+        plan = self.scan()
+        self.assertEqual([asset.rel_path for asset in plan.assets], ["index.css", os.path.join("images", "logo.png")])
+        self.assertEqual(plan.asset_dirs, [".", "empty", "images"])
+        self.assertEqual(plan.assets[0].mtime_ns, os.stat(os.path.join(self.static, "index.css")).st_mtime_ns)
+
+    def test_stages_consume_the_plan(self):
+        plan = self.scan()
+        # Files added after the scan are not part of this build.
+        write(os.path.join(self.content, "late.md"), "# Late")
+        write(os.path.join(self.static, "late.css"), "")
+        docs = os.path.join(self.tmp.name, "docs")
+        template = os.path.join(self.tmp.name, "template.html")
+        write(template, "{{ Title }}{{ Content }}")
+        sync_source_to_target(self.static, docs, plan=plan)
+        stats = generate_pages_recursive(self.content, template, docs, "/", plan=plan)
+        self.assertEqual(stats.built, 3)
+        self.assertFalse(os.path.exists(os.path.join(docs, "late.html")))
+        self.assertFalse(os.path.exists(os.path.join(docs, "late.css")))
+        self.assertTrue(os.path.isfile(os.path.join(docs, "images", "logo.png")))
+
+
+if __name__ == '__main__':
+    unittest.main()
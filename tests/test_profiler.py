@@ -0,0 +1,56 @@
+import unittest
+
+from profiler import NULL_STAGE, Profiler, chrome_trace, profile_report, slowest_pages
+from stats import BuildStats
+
+
+def page(source, start, end, stages):
+    return {"source": source, "pid": 1, "start": start, "end": end, "stages": stages}
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_stage_is_noop(self):
+        profiler = Profiler()
+        self.assertIs(profiler.stage("inline"), NULL_STAGE)
+        with profiler.stage("inline"):
+            pass
+        self.assertEqual(profiler.take_totals(), {})
+
+    def test_enabled_stage_accumulates(self):
+        profiler = Profiler()
+        profiler.set_enabled(True)
+        for _ in range(3):
+            with profiler.stage("inline"):
+                pass
+        totals = profiler.take_totals()
+        self.assertEqual(list(totals), ["inline"])
+        self.assertEqual(profiler.take_totals(), {})
+
+
+class TestProfileReport(unittest.TestCase):
+    def setUp(self):
+        self.stats = BuildStats()
+        self.stats.phases = [("assets", 0, 1_000_000), ("pages", 1_000_000, 9_000_000)]
+        self.stats.page_profiles = [
+            page("a.md", 1_000_000, 3_000_000, {"inline": 1_500_000}),
+            page("b.md", 3_000_000, 9_000_000, {"inline": 2_000_000, "write": 1_000_000}),
+        ]
+
+    def test_report_fills_other(self):
+        report = profile_report(self.stats)
+        self.assertEqual(report["phases_ms"], {"assets": 1.0, "pages": 8.0})
+        self.assertEqual(report["stages_ms"], {"inline": 3.5, "other": 3.5, "write": 1.0})
+        self.assertEqual(report["pages"][0]["stages_ms"]["other"], 0.5)
+
+    def test_slowest_pages(self):
+        self.assertEqual([p["source"] for p in slowest_pages(self.stats, 1)], ["b.md"])
+
+    def test_chrome_trace_is_relative(self):
+        events = chrome_trace(self.stats)["traceEvents"]
+        self.assertEqual(len(events), 4)
+        self.assertEqual(events[0]["ts"], 0)
+        self.assertEqual(events[3]["dur"], 6000)
+
+
+if __name__ == '__main__':
+    unittest.main()
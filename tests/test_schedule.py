@@ -0,0 +1,118 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from helpers import reset_logging, write
+from main import main
+from manifest import BuildManifest
+from schedule import DEFAULT_MS_PER_KB, batch_jobs, estimate_costs, format_plan, longest_first, simulate
+from utils import generate_pages_recursive
+
+
+def job(from_path, render_ms=None):
+    previous = None if render_ms is None else {"render_ms": render_ms}
+    return (from_path, [(from_path.replace(".md", ".html"), previous)])
+
+
+class TestEstimateCosts(unittest.TestCase):
+    def test_history_then_size(self):
+        work = [job("a.md", 10.0), job("b.md"), job("c.md")]
+        sizes = {"a.md": 2048, "b.md": 1024, "c.md": 4096}
+        # a.md took 10 ms for 2 KB, so unseen pages are costed at 5 ms/KB.
+        self.assertEqual(estimate_costs(work, sizes), [(10.0, "history"), (5.0, "size"), (20.0, "size")])
+
+    def test_default_rate_without_history(self):
+        self.assertEqual(estimate_costs([job("a.md")], {"a.md": 1024}), [(DEFAULT_MS_PER_KB, "size")])
+
+
+class TestScheduling(unittest.TestCase):
+    def test_longest_first_shortens_critical_path(self):
+        costs = [1, 1, 1, 1, 1, 1, 6]
+        in_order = max(load for load, _, _ in simulate(range(len(costs)), costs, 2))
+        largest_first = max(load for load, _, _ in simulate(longest_first(costs), costs, 2))
+        self.assertEqual(in_order, 9)
+        self.assertEqual(largest_first, 6)
+
+    def test_batches_group_the_small_tail(self):
+        costs = [100, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+        batches = batch_jobs(longest_first(costs), costs, 1)
+        self.assertEqual(batches[0], [0])
+        self.assertEqual(sorted(i for batch in batches for i in batch), list(range(len(costs))))
+        self.assertLess(len(batches), len(costs))
+
+    def test_format_plan(self):
+        work = [job("big.md", 30.0), job("small.md", 5.0), job("other.md", 20.0)]
+        plan = format_plan(work, estimate_costs(work, {}), 2).splitlines()
+        self.assertEqual(plan[0], "Plan: 3 pages to render (3 timed by history, 0 estimated from size)")
+        self.assertEqual(plan[1], "Total cost 55.0 ms across 2 workers, predicted build time 30.0 ms")
+        self.assertIn("big.md", plan[3])
+
+
+class InlineExecutor:
+    # Stands in for the ProcessPoolExecutor: runs batches in this process
+    # and records the order they were handed out in.
+    batches = []
+
+    def __init__(self, max_workers, initializer=None, initargs=()):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def map(self, fn, batches):
+        batches = list(batches)
+        InlineExecutor.batches = [[from_path for from_path, _ in batch] for batch in batches]
+        return map(fn, batches)
+
+
+class TestScheduledBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write(self.template, "{{ Title }}{{ Content }}")
+        for i in range(8):
+            write(os.path.join(self.content, f"page{i}.md"), f"# Page {i}\n\n" + "Some **text**.\n\n" * (i * 50))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_records_render_times(self):
+        manifest = BuildManifest(os.path.join(self.tmp.name, "docs"))
+        with self.assertLogs("ssg", "DEBUG"):
+            generate_pages_recursive(self.content, self.template, manifest.root, "/", manifest, jobs=2)
+        self.assertEqual(len(manifest.pages), 8)
+        for entry in manifest.pages.values():
+            self.assertGreater(entry["render_ms"], 0)
+
+    def test_dispatches_longest_first(self):
+        dest = os.path.join(self.tmp.name, "docs")
+        with mock.patch("utils.ProcessPoolExecutor", InlineExecutor), self.assertLogs("ssg", "DEBUG"):
+            generate_pages_recursive(self.content, self.template, dest, "/", BuildManifest(dest), jobs=2)
+        dispatched = [os.path.basename(from_path) for batch in InlineExecutor.batches for from_path in batch]
+        # No history yet, so the biggest sources go first.
+        self.assertEqual(dispatched, [f"page{i}.md" for i in reversed(range(8))])
+        self.assertEqual(InlineExecutor.batches[0], [os.path.join(self.content, "page7.md")])
+
+    def test_plan_writes_nothing(self):
+        write(os.path.join(self.tmp.name, "static", "index.css"), "body {}")
+        out = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(out):
+                main(["--root", self.tmp.name, "--plan"])
+        finally:
+            reset_logging()
+        self.assertTrue(out.getvalue().startswith("Plan: 8 pages to render (0 timed by history, 8 estimated from size)"))
+        self.assertIn("page7.md", out.getvalue().splitlines()[3])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "docs")))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, ".ssg-cache")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from helpers import read_tree, reset_logging, write
+from main import main
+from plan import BuildPlan, SourceFile
+from shard import merge_shards, parse_shard, shard_of, shard_plan
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+
+
+class TestSharding(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "1", "a/b", "1/0"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_shards_partition_the_plan(self):
+        plan = BuildPlan([SourceFile(f"content/p{i}.md", f"p{i}.md", f"p{i}.html", 0, 0) for i in range(50)])
+        shards = [shard_plan(plan, index, 3) for index in (1, 2, 3)]
+        self.assertEqual(sorted(page.rel_path for shard in shards for page in shard.pages), sorted(page.rel_path for page in plan.pages))
+        self.assertTrue(all(shard.pages for shard in shards))
+        # Stable across runs and machines: pinned to sha256 of the key.
+        self.assertEqual([shard_of(f"content/p{i}.md", 4) for i in range(4)], [3, 1, 1, 2])
+        self.assertEqual(shard_of("content/index.md", 4), 2)
+
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        write(os.path.join(self.root, "template.html"), '<link href="/index.css">{{ Title }}{{ Content }}')
+        write(os.path.join(self.root, "static", "index.css"), "body {}")
+        write(os.path.join(self.root, "static", "images", "logo.png"), "png")
+        for i in range(12):
+            write(os.path.join(self.root, "content", f"section{i % 3}", f"page{i}.md"), f"# Page {i}\n\n![logo](/images/logo.png)")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        reset_logging()
+
+    def build(self, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return main(["--root", self.root, "--quiet", "--no-cache", *args])
+
+    def test_merged_shards_match_single_build(self):
+        self.build("--fingerprint", "--target", "/=single")
+        env = dict(os.environ, PYTHONPATH=SRC)
+        shards = [subprocess.Popen([sys.executable, os.path.join(SRC, "main.py"), "--root", self.root, "--quiet", "--no-cache", "--fingerprint", "--shard", f"{i}/3"], env=env)
+                  for i in (1, 2, 3)]
+        self.assertEqual([process.wait() for process in shards], [0, 0, 0])
+        with contextlib.redirect_stdout(io.StringIO()):
+            main(["merge", "--root", self.root])
+        self.assertEqual(read_tree(os.path.join(self.root, "docs")), read_tree(os.path.join(self.root, "single")))
+
+    def test_merge_rejects_missing_shard(self):
+        self.build("--shard", "1/2")
+        shard = os.path.join(self.root, "docs-shard-1-of-2")
+        with self.assertRaisesRegex(ValueError, r"missing \[2\]"):
+            merge_shards([shard], os.path.join(self.root, "docs"))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs")))
+
+    def test_merge_rejects_failed_shard(self):
+        write(os.path.join(self.root, "content", "broken.md"), "no title")
+        for i in (1, 2):
+            try:
+                self.build("--shard", f"{i}/2")
+            except SystemExit:
+                pass
+        shards = [os.path.join(self.root, f"docs-shard-{i}-of-2") for i in (1, 2)]
+        with self.assertRaisesRegex(ValueError, "failed to build"):
+            merge_shards(shards, os.path.join(self.root, "docs"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from markdown import parse_document
+from template import Template, rewrite_basepath, rewrite_urls
+
+SOURCE = '<title>{{ Title }}</title><link href="/index.css" /><article>{{ Content }}</article>'
+
+
+def render(template, markdown):
+    return template.render_document(parse_document(markdown))
+
+
+class TestTemplate(unittest.TestCase):
+    def test_segments_and_slots(self):
+        template = Template(SOURCE)
+        self.assertEqual(template.slots, [("Title", "{{ Title }}"), ("Content", "{{ Content }}")])
+        self.assertEqual(template.segments, ["<title>", '</title><link href="/index.css" /><article>', "</article>"])
+
+    def test_render(self):
+        template = Template(SOURCE)
+        self.assertEqual(
+            render(template, "# Hi"),
+            '<title>Hi</title><link href="/index.css" /><article><div><h1>Hi</h1></div></article>',
+        )
+
+    def test_basepath_rewrites_segments_once(self):
+        template = Template(SOURCE, "/blog/")
+        self.assertIn('href="/blog/index.css"', template.segments[1])
+
+    def test_basepath_rewrites_content(self):
+        template = Template(SOURCE, "/blog/")
+        page = render(template, "# Hi\n\n[a](/about) ![x](/x.png)")
+        self.assertIn('<a href="/blog/about">', page)
+        self.assertIn('<img src="/blog/x.png"', page)
+
+    def test_matches_str_replace(self):
+        content = '<div><h1>T</h1><p><a href="/x">x</a></p></div>'
+        expected = SOURCE.replace("{{ Title }}", "T").replace("{{ Content }}", content)
+        expected = expected.replace('href="/', 'href="/base/').replace('src="/', 'src="/base/')
+        self.assertEqual(render(Template(SOURCE, "/base/"), "# T\n\n[x](/x)"), expected)
+
+    def test_unknown_slot_left_alone(self):
+        template = Template("{{ Title }} {{ Other }}")
+        self.assertEqual(render(template, "# T"), "T {{ Other }}")
+
+    def test_hash_ignores_basepath(self):
+        self.assertEqual(Template(SOURCE).hash, Template(SOURCE, "/blog/").hash)
+
+    def test_rewrite_root_basepath_is_noop(self):
+        html = '<a href="/x">x</a>'
+        self.assertIs(rewrite_basepath(html, "/"), html)
+
+    def test_code_sample_urls_are_not_rewritten(self):
+        page = render(Template(SOURCE, "/blog/"), '# Hi\n\n`<a href="/x">`')
+        self.assertIn('<code><a href="/x"></code>', page)
+
+    def test_fingerprinted_assets(self):
+        assets = {"/index.css": "/index.abc123.css", "/x.png": "/x.def456.png"}
+        template = Template(SOURCE, "/blog/", assets=assets)
+        self.assertIn('href="/blog/index.abc123.css"', template.segments[1])
+        page = render(template, "# Hi\n\n[a](/about) ![x](/x.png)")
+        self.assertIn('<a href="/blog/about">', page)
+        self.assertIn('<img src="/blog/x.def456.png"', page)
+        self.assertNotEqual(template.hash, Template(SOURCE, "/blog/").hash)
+
+    def test_rewrite_urls_without_assets_matches_basepath(self):
+        html = '<a href="/x">x</a><img src="/y.png"></img>'
+        self.assertEqual(rewrite_urls(html, "/base/"), rewrite_basepath(html, "/base/"))
+        self.assertEqual(rewrite_urls(html, "/base/", {"/z": "/z.1"}), rewrite_basepath(html, "/base/"))
+
+
+if __name__ == '__main__':
+    unittest.main()
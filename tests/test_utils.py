@@ -0,0 +1,198 @@
+import json
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest, hash_bytes
+from template import Template
+from cache import ParseCache
+from helpers import read_tree, write
+from utils import commit_output, generate_pages_recursive, generate_pages_targets, render_page, sync_source_to_target
+
+
+class TestSyncSourceToTarget(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "static")
+        self.target = os.path.join(self.tmp.name, "docs")
+        write(os.path.join(self.source, "index.css"), "body {}")
+        write(os.path.join(self.source, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sync(self, **kwargs):
+        return sync_source_to_target(self.source, self.target, **kwargs)
+
+    def test_copies_then_skips_unchanged(self):
+        self.assertEqual(self.sync().assets_copied, 2)
+        stats = self.sync()
+        self.assertEqual(stats.assets_copied, 0)
+        self.assertEqual(stats.assets_unchanged, 2)
+
+    def test_recopies_changed_file(self):
+        self.sync()
+        write(os.path.join(self.source, "index.css"), "body { color: red }")
+        self.assertEqual(self.sync().assets_copied, 1)
+        with open(os.path.join(self.target, "index.css")) as f:
+            self.assertEqual(f.read(), "body { color: red }")
+
+    def test_removes_orphans_but_keeps_pages(self):
+        write(os.path.join(self.target, "old", "gone.txt"), "x")
+        write(os.path.join(self.target, "blog", "index.html"), "<p>page</p>")
+        stats = self.sync(keep={os.path.join("blog", "index.html")})
+        self.assertEqual(stats.assets_removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.target, "old")))
+        self.assertTrue(os.path.exists(os.path.join(self.target, "blog", "index.html")))
+
+    def test_hash_mode_detects_same_size_edit(self):
+        self.sync()
+        target_css = os.path.join(self.target, "index.css")
+        write(target_css, "body {!")
+        os.utime(target_css, ns=(0, os.stat(os.path.join(self.source, "index.css")).st_mtime_ns))
+        self.assertEqual(self.sync().assets_copied, 0)
+        self.assertEqual(self.sync(use_hash=True).assets_copied, 1)
+
+    def test_fingerprint_renames_and_writes_manifest(self):
+        assets = {}
+        self.sync(assets=assets)
+        self.assertEqual(sorted(assets), ["/images/a.png", "/index.css"])
+        css = assets["/index.css"]
+        self.assertRegex(css, r"^/index\.[0-9a-f]{10}\.css$")
+        self.assertTrue(os.path.isfile(os.path.join(self.target, css[1:])))
+        self.assertFalse(os.path.exists(os.path.join(self.target, "index.css")))
+        with open(os.path.join(self.target, "assets.json")) as f:
+            self.assertEqual(json.load(f), assets)
+
+        write(os.path.join(self.source, "index.css"), "body { color: red }")
+        changed = {}
+        stats = self.sync(assets=changed)
+        self.assertNotEqual(changed["/index.css"], css)
+        self.assertEqual(stats.assets_removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.target, css[1:])))
+
+    def test_link_mode_shares_inode(self):
+        self.sync(link=True)
+        source_stat = os.stat(os.path.join(self.source, "index.css"))
+        target_stat = os.stat(os.path.join(self.target, "index.css"))
+        self.assertEqual(source_stat.st_ino, target_stat.st_ino)
+
+
+class TestWriteOutputs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "index.md")
+        self.dest = os.path.join(self.tmp.name, "docs", "index.html")
+        self.template = Template("<title>{{ Title }}</title>{{ Content }}", path="template.html")
+        write(self.source, "# Hello")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self):
+        result = render_page((self.source, self.dest, None), self.template)
+        self.assertIsNone(result.error)
+        self.assertTrue(result.built)
+        return result
+
+    def test_identical_output_keeps_file(self):
+        self.assertTrue(self.render().changed)
+        os.utime(self.dest, ns=(0, 0))
+        write(self.source, "# Hello\n\n")
+        self.assertFalse(self.render().changed)
+        self.assertEqual(os.stat(self.dest).st_mtime_ns, 0)
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_changed_output_is_replaced(self):
+        self.render()
+        inode = os.stat(self.dest).st_ino
+        write(self.source, "# Goodbye")
+        self.assertTrue(self.render().changed)
+        with open(self.dest) as f:
+            self.assertEqual(f.read(), "<title>Goodbye</title><div><h1>Goodbye</h1></div>")
+        self.assertNotEqual(os.stat(self.dest).st_ino, inode)
+
+    def test_commit_output_compares_content(self):
+        tmp_path = self.dest + ".tmp"
+        write(tmp_path, "abc")
+        self.assertTrue(commit_output(tmp_path, self.dest, hash_bytes(b"abc")))
+        write(tmp_path, "abd")
+        self.assertTrue(commit_output(tmp_path, self.dest, hash_bytes(b"abd")))
+        write(tmp_path, "abd")
+        self.assertFalse(commit_output(tmp_path, self.dest, hash_bytes(b"abd")))
+        self.assertFalse(os.path.exists(tmp_path))
+
+
+class TestGeneratePagesTargets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write(self.template, '<link href="/index.css">{{ Content }}')
+        write(os.path.join(self.content, "index.md"), "# Home\n\n[About](/about) ![cat](/cat.png)\n\n```\n<a href=\"/raw\">\n```")
+        write(os.path.join(self.content, "about", "index.md"), "# About")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, *parts):
+        with open(os.path.join(self.tmp.name, *parts)) as f:
+            return f.read()
+
+    def test_parses_once_for_every_target(self):
+        targets = [("/", os.path.join(self.tmp.name, "docs"), None), ("/site/", os.path.join(self.tmp.name, "dist"), None)]
+        cache = ParseCache(os.path.join(self.tmp.name, ".ssg-cache"))
+        stats = generate_pages_targets(self.content, self.template, targets, cache=cache)
+        generate_pages_recursive(self.content, self.template, os.path.join(self.tmp.name, "single"), "/site/")
+        self.assertEqual(stats.built, 4)
+        self.assertEqual(stats.parse_cache_misses, 2)
+        self.assertEqual(self.read("dist", "index.html"), self.read("single", "index.html"))
+        self.assertEqual(
+            self.read("dist", "index.html"),
+            '<link href="/site/index.css"><div><h1>Home</h1><p><a href="/site/about">About</a> '
+            '<img src="/site/cat.png" alt="cat">cat</img></p><pre><code>\n<a href="/raw">\n</code></pre></div>',
+        )
+        self.assertIn('<a href="/about">', self.read("docs", "index.html"))
+
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(10):
+            write(os.path.join(self.content, f"section{i % 3}", f"page{i}.md"), f"# Page {i}\n\n" + "Some **bold** [link](/x).\n\n" * (i * 20))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, name, jobs):
+        dest = os.path.join(self.tmp.name, name)
+        manifest = BuildManifest(dest)
+        with self.assertLogs("ssg", "DEBUG") as logs:
+            stats = generate_pages_recursive(self.content, self.template, dest, "/", manifest, jobs=jobs)
+        return stats, manifest, [line.replace(name, "out") for line in logs.output]
+
+    def test_matches_serial_build(self):
+        _, serial_manifest, serial_log = self.build("serial", 1)
+        stats, parallel_manifest, parallel_log = self.build("parallel", 3)
+        self.assertEqual(stats.built, 10)
+        self.assertEqual(read_tree(os.path.join(self.tmp.name, "parallel")), read_tree(os.path.join(self.tmp.name, "serial")))
+        # Reported in discovery order whatever order the workers finish in.
+        self.assertEqual(parallel_log, serial_log)
+        self.assertEqual(list(parallel_manifest.pages), list(serial_manifest.pages))
+
+    def test_failed_page_does_not_stop_the_pool(self):
+        broken = os.path.join(self.content, "section1", "broken.md")
+        write(broken, "no title here")
+        stats, manifest, log = self.build("parallel", 3)
+        self.assertEqual(stats.failed, [broken])
+        self.assertEqual(stats.built, 10)
+        self.assertEqual(len(manifest.pages), 10)
+        self.assertIn("No title", "\n".join(line for line in log if line.startswith("ERROR")))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "parallel", "section1", "broken.html")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+import urllib.request
+
+from helpers import write
+from manifest import BuildManifest
+from server import RELOAD_PATH, RELOAD_SCRIPT, ReloadNotifier, start_server
+from utils import generate_pages_recursive, sync_source_to_target
+from watch import Watcher, diff_snapshots, page_dest_path, snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_snapshot_and_diff(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "blog"))
+            a = os.path.join(root, "index.md")
+            b = os.path.join(root, "blog", "index.md")
+            for path in (a, b):
+                with open(path, "w") as f:
+                    f.write("# hi")
+            old = snapshot(root)
+            self.assertEqual(sorted(old), sorted([a, b]))
+
+            with open(a, "w") as f:
+                f.write("# changed")
+            os.remove(b)
+            self.assertEqual(diff_snapshots(old, snapshot(root)), ([a], [b]))
+
+    def test_skips_entries_that_vanish(self):
+        with tempfile.TemporaryDirectory() as root:
+            write(os.path.join(root, "index.md"), "# Home")
+            # A dangling symlink fails stat() like a file deleted mid-scan
+            # (and is what some editors leave as a lock file).
+            os.symlink(os.path.join(root, "gone.md"), os.path.join(root, ".#index.md"))
+            self.assertEqual(list(snapshot(root)), [os.path.join(root, "index.md")])
+            self.assertEqual(snapshot(os.path.join(root, "missing")), {})
+
+    def test_unchanged(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "index.md"), "w") as f:
+                f.write("# hi")
+            old = snapshot(root)
+            self.assertEqual(diff_snapshots(old, snapshot(root)), ([], []))
+
+    def test_page_dest_path(self):
+        self.assertEqual(
+            page_dest_path(os.path.join("content", "blog", "index.md"), "content", "docs"),
+            os.path.join("docs", "blog", "index.html"),
+        )
+
+
+class TestWatcherRebuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        write(os.path.join(self.content, "index.md"), "# Home")
+        write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        write(os.path.join(self.static, "index.css"), "body {}")
+        manifest = BuildManifest(self.docs)
+        sync_source_to_target(self.static, self.docs)
+        generate_pages_recursive(self.content, self.template, self.docs, "/", manifest)
+        self.watcher = Watcher(self.content, self.static, self.template, self.docs, "/", manifest)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def rebuild(self):
+        return self.watcher.rebuild(self.watcher.poll())
+
+    def read(self, *parts):
+        with open(os.path.join(self.docs, *parts)) as f:
+            return f.read()
+
+    def test_rebuilds_only_the_changed_page(self):
+        write(os.path.join(self.content, "blog", "post.md"), "# Post, edited")
+        stats = self.rebuild()
+        self.assertEqual((stats.built, stats.skipped), (1, 0))
+        self.assertIn("<h1>Post, edited</h1>", self.read("blog", "post.html"))
+        self.assertEqual(stats.changed_outputs, [os.path.join(self.docs, "blog", "post.html")])
+
+    def test_removes_deleted_page(self):
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        stats = self.rebuild()
+        self.assertEqual(stats.removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "post.html")))
+        self.assertNotIn(os.path.join("blog", "post.html"), self.watcher.manifest.pages)
+
+    def test_template_change_rebuilds_every_page(self):
+        write(self.template, "<main>{{ Content }}</main>")
+        stats = self.rebuild()
+        self.assertEqual(stats.built, 2)
+        self.assertTrue(self.read("index.html").startswith("<main>"))
+        self.assertTrue(self.read("blog", "post.html").startswith("<main>"))
+
+    def test_template_change_prunes_page_deleted_in_same_poll(self):
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        write(self.template, "<main>{{ Content }}</main>")
+        stats = self.rebuild()
+        self.assertEqual((stats.built, stats.removed), (1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "post.html")))
+        self.assertEqual(list(BuildManifest.load(self.docs).pages), ["index.html"])
+
+    def test_copies_changed_and_removes_deleted_assets(self):
+        write(os.path.join(self.static, "index.css"), "body { color: red }")
+        write(os.path.join(self.static, "extra.css"), "p {}")
+        stats = self.rebuild()
+        self.assertEqual((stats.assets_copied, stats.built), (2, 0))
+        self.assertEqual(self.read("index.css"), "body { color: red }")
+        os.remove(os.path.join(self.static, "extra.css"))
+        stats = self.rebuild()
+        self.assertEqual(stats.assets_removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "extra.css")))
+
+
+class TestLiveReloadServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.page = os.path.join(self.tmp.name, "blog", "index.html")
+        write(self.page, "<html><body><p>hi</p></body></html>")
+        write(os.path.join(self.tmp.name, "index.css"), "body {}")
+        self.notifier = ReloadNotifier()
+        self.server = start_server(self.tmp.name, 0, self.notifier)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def get(self, path):
+        with urllib.request.urlopen(self.base + path, timeout=5) as response:
+            return response.read()
+
+    def test_injects_reload_script_without_touching_the_file(self):
+        body = self.get("/blog/")
+        self.assertEqual(body, b"<html><body><p>hi</p>" + RELOAD_SCRIPT + b"</body></html>")
+        with open(self.page) as f:
+            self.assertEqual(f.read(), "<html><body><p>hi</p></body></html>")
+        self.assertEqual(self.get("/index.css"), b"body {}")
+
+    def test_head_sends_no_body(self):
+        with socket.create_connection(("127.0.0.1", self.server.server_address[1]), timeout=5) as sock:
+            sock.sendall(b"HEAD /blog/ HTTP/1.0\r\n\r\n")
+            response = b""
+            while chunk := sock.recv(4096):
+                response += chunk
+        headers, _, body = response.partition(b"\r\n\r\n")
+        self.assertIn(b"Content-Length: %d" % len(self.get("/blog/")), headers)
+        self.assertEqual(body, b"")
+
+    def test_streams_reload_event(self):
+        with urllib.request.urlopen(self.base + RELOAD_PATH, timeout=5) as response:
+            self.assertEqual(response.headers["Content-Type"], "text/event-stream")
+            # The handler reads the current version after sending headers;
+            # keep notifying until the event arrives.
+            done = threading.Event()
+
+            def notify():
+                while not done.wait(0.05):
+                    self.notifier.notify()
+
+            thread = threading.Thread(target=notify)
+            thread.start()
+            try:
+                self.assertEqual(response.readline(), b"data: reload\n")
+            finally:
+                done.set()
+                thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()